@@ -0,0 +1,206 @@
+"""Measures the per-frame cost of the Scene update/draw loop on synthetic trees,
+and the time to clear each tree afterwards. Runs headless using the SDL dummy
+video driver. For example:
+  python -m engine.benchmarks.frame_time --scales 1000 10000 --output bench.json
+"""
+
+import os
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+import argparse
+import json
+import platform
+import statistics
+import sys
+import time
+from itertools import cycle
+
+import pygame
+from engine.scene import Scene
+from engine.node import Transform, Node, SpriteNode, NodeProps
+from engine.interface import Button, ListLayout
+from engine.transform_array import TransformArray
+
+SCREEN_SIZE = 960, 640
+DEFAULT_SCALES = (1000, 10000, 100000)
+NODE_KINDS = ('Node', 'SpriteNode', 'Button', 'ListLayout')
+
+class Tile:
+    """A minimal ListLayout tile with a transform and an image."""
+    def __init__(self, width, height, color):
+        self.transform = Transform(0, 0, width, height)
+        self.image = pygame.Surface(self.transform.get_surface_size())
+        self.image.fill(color)
+
+def tile_generator(count=4):
+    for i in range(count):
+        yield Tile, 40, 10, (60, 60, 60), {}
+
+def create_node(kind, parent, group, index):
+    """Create a node of the given kind name as a child of the parent."""
+    x, y = index % 97, index % 61
+    if kind == 'Node':
+        return Node(NodeProps(parent, x, y, 20, 20))
+    elif kind == 'SpriteNode':
+        return SpriteNode(NodeProps(parent, x, y, 8, 8), group, fill_color=(90, 30, 30))
+    elif kind == 'Button':
+        return Button(NodeProps(parent, x, y, 40, 16), group, str(index % 10))
+    elif kind == 'ListLayout':
+        return ListLayout(NodeProps(parent, x, y, 40, 30), group, tiles=tile_generator())
+    raise ValueError(f'Unknown node kind (got {kind}), expected one of {NODE_KINDS}')
+
+def build_tree(scene, node_count: int, branching=8, kinds=NODE_KINDS):
+    """Add node_count nodes to the scene in breadth-first order, where each
+    node has up to branching child nodes. Returns the list of created nodes."""
+    created = []
+    kind_names = cycle(kinds)
+    for i in range(node_count):
+        parent = scene if i < branching else created[i // branching - 1]
+        created.append(create_node(next(kind_names), parent, scene.group_draw, i))
+    return created
+
+def mouse_events(frame: int, count: int):
+    """A list of mouse events to dispatch in one frame, including a click."""
+    events = []
+    for i in range(count):
+        position = ((frame * 7 + i * 13) % SCREEN_SIZE[0], (frame * 5 + i * 11) % SCREEN_SIZE[1])
+        events.append(pygame.event.Event(pygame.MOUSEMOTION, pos=position, rel=(1, 1), buttons=(0, 0, 0)))
+    events.append(pygame.event.Event(pygame.MOUSEBUTTONDOWN, pos=position, button=1))
+    events.append(pygame.event.Event(pygame.MOUSEBUTTONUP, pos=position, button=1))
+    return events
+
+def summarise(samples: list) -> dict:
+    """Summary statistics in milliseconds of a list of times in seconds."""
+    samples_ms = [sample * 1000 for sample in samples]
+    return {'mean': statistics.mean(samples_ms), 'median': statistics.median(samples_ms),
+            'min': min(samples_ms), 'max': max(samples_ms)}
+
+def run_scale(node_count: int, frames=60, events_per_frame=16, branching=8, kinds=NODE_KINDS,
+              lazy_transforms=False, array_storage=False) -> dict:
+    """Build a scene with node_count nodes and time each stage of the frame loop.
+    Each frame, the top-level nodes move so that their subtrees are redrawn."""
+    screen = pygame.display.set_mode(SCREEN_SIZE)
+    scene = Scene(screen, pygame.time.Clock())
+    scene.lazy_transforms = lazy_transforms
+    if array_storage:
+        scene.transform_storage = TransformArray(node_count)
+    scene.create_draw_group((20, 20, 24))
+
+    start = time.perf_counter()
+    build_tree(scene, node_count, branching, kinds)
+    build_seconds = time.perf_counter() - start
+
+    # Time LayeredDirty.draw separately by wrapping it on the group instance
+    group_draw_samples = []
+    group_draw = scene.group_draw.draw
+
+    def timed_group_draw(surface, *args):
+        group_start = time.perf_counter()
+        rects = group_draw(surface, *args)
+        group_draw_samples.append(time.perf_counter() - group_start)
+        return rects
+    scene.group_draw.draw = timed_group_draw
+
+    samples = {'handle_events': [], 'move': [], 'update': [], 'draw': []}
+    for frame in range(frames):
+        events = mouse_events(frame, events_per_frame)
+        step = 1 if frame % 2 == 0 else -1
+
+        stage_start = time.perf_counter()
+        scene.handle_events(events)
+        samples['handle_events'].append(time.perf_counter() - stage_start)
+
+        stage_start = time.perf_counter()
+        for node in scene.nodes:
+            node.transform.x += step
+            node.transform.y += step
+        samples['move'].append(time.perf_counter() - stage_start)
+
+        stage_start = time.perf_counter()
+        scene.update()
+        samples['update'].append(time.perf_counter() - stage_start)
+
+        stage_start = time.perf_counter()
+        scene.draw()
+        samples['draw'].append(time.perf_counter() - stage_start)
+
+    # Time deleting the whole tree, which removes its sprites and event handlers
+    start = time.perf_counter()
+    scene.clear()
+    clear_seconds = time.perf_counter() - start
+
+    result = {'nodes': node_count, 'frames': frames, 'events_per_frame': events_per_frame,
+              'branching': branching, 'kinds': list(kinds), 'lazy_transforms': lazy_transforms,
+              'array_storage': array_storage, 'build_ms': build_seconds * 1000,
+              'clear_ms': clear_seconds * 1000}
+    for stage, stage_samples in samples.items():
+        result[stage + '_ms'] = summarise(stage_samples)
+    result['group_draw_ms'] = summarise(group_draw_samples)
+    frame_totals = [sum(stage_samples) for stage_samples in zip(*samples.values())]
+    result['frame_ms'] = summarise(frame_totals)
+    return result
+
+def environment() -> dict:
+    return {'python': platform.python_version(), 'pygame': pygame.version.ver,
+            'sdl': '.'.join(map(str, pygame.get_sdl_version())),
+            'platform': platform.platform(), 'video_driver': os.environ.get('SDL_VIDEODRIVER')}
+
+def format_result(result: dict) -> str:
+    stages = ('handle_events', 'move', 'update', 'draw', 'group_draw', 'frame')
+    columns = '  '.join(f'{stage} {result[stage + "_ms"]["mean"]:.3f}' for stage in stages)
+    return f'{result["nodes"]:>7} nodes (mean ms)  {columns}  clear {result["clear_ms"]:.1f}'
+
+def compare(report: dict, baseline: dict) -> list:
+    """Lines describing the change in mean frame stage times from a baseline
+    report, for results with matching node counts."""
+    baseline_results = {result['nodes']: result for result in baseline.get('results', [])}
+    lines = []
+    for result in report['results']:
+        previous = baseline_results.get(result['nodes'])
+        if previous is None:
+            continue
+        for key, value in result.items():
+            if key.endswith('_ms') and isinstance(value, dict) and key in previous:
+                ratio = value['mean'] / max(previous[key]['mean'], 1e-9)
+                lines.append(f'{result["nodes"]:>7} nodes  {key[:-3]:<14} x{ratio:.2f}')
+    return lines
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--scales', type=int, nargs='+', default=DEFAULT_SCALES,
+                        help='numbers of nodes in each benchmarked tree')
+    parser.add_argument('--frames', type=int, default=60, help='frames measured per scale')
+    parser.add_argument('--events', type=int, default=16, help='mouse motion events per frame')
+    parser.add_argument('--branching', type=int, default=8, help='maximum child nodes per node')
+    parser.add_argument('--kinds', nargs='+', default=NODE_KINDS, choices=NODE_KINDS,
+                        help='node classes used in turn to build the tree')
+    parser.add_argument('--lazy', action='store_true', help='set Scene.lazy_transforms')
+    parser.add_argument('--array', action='store_true', help='set Scene.transform_storage')
+    parser.add_argument('--output', help='write the JSON results to this file (default: stdout)')
+    parser.add_argument('--compare', help='a previous JSON results file to compare against')
+    args = parser.parse_args(argv)
+
+    pygame.init()
+    report = {'environment': environment(), 'results': []}
+    for node_count in args.scales:
+        result = run_scale(node_count, args.frames, args.events, args.branching, args.kinds,
+                           args.lazy, args.array)
+        report['results'].append(result)
+        print(format_result(result), file=sys.stderr)
+    pygame.quit()
+
+    if args.compare:
+        with open(args.compare, 'r') as f:
+            for line in compare(report, json.load(f)):
+                print(line, file=sys.stderr)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    return report
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+"""Measures the cost of drawing text that changes every frame, using
+font.render and using the glyph atlas of engine.text. For example:
+  python -m engine.benchmarks.text_render --sizes 15 24 48
+"""
+
+import os
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+import argparse
+import json
+import sys
+import time
+
+import pygame
+import engine.text as text
+from engine.benchmarks.frame_time import environment, summarise
+
+def messages(count: int) -> list:
+    """Changing numeric strings, like a frame counter or an inspector row."""
+    return [f'{i * 7 % 1000}ms / s ({i % 50}ms / frame)' for i in range(count)]
+
+def time_draws(surface, strings, font, repeats: int) -> list:
+    samples = []
+    for repeat in range(repeats):
+        start = time.perf_counter()
+        for message in strings:
+            text.draw(surface, message, (10, 10), font=font)
+        samples.append((time.perf_counter() - start) / len(strings))
+    return samples
+
+def run_size(font_size: int, count=2000, repeats=5) -> dict:
+    surface = pygame.Surface((960, 640))
+    font = pygame.font.Font(None, font_size)
+    strings = messages(count)
+    result = {'font_size': font_size, 'strings': count}
+
+    result['font_render_ms'] = summarise(time_draws(surface, strings, font, repeats))
+    start = time.perf_counter()
+    text.enable_glyph_atlas(font)
+    text.glyph_atlas(strings[0], font, text.COLOR_DEFAULT)
+    result['atlas_setup_ms'] = (time.perf_counter() - start) * 1000
+    composed = sum(text.glyph_atlas(message, font) is not None for message in strings)
+    result['atlas_composed'] = composed / count
+    result['glyph_atlas_ms'] = summarise(time_draws(surface, strings, font, repeats))
+    text.disable_glyph_atlas(font)
+    return result
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=(15, 24, 48), help='font sizes')
+    parser.add_argument('--strings', type=int, default=2000, help='strings drawn per repeat')
+    parser.add_argument('--repeats', type=int, default=5)
+    args = parser.parse_args(argv)
+
+    pygame.init()
+    report = {'environment': environment(), 'results': []}
+    for font_size in args.sizes:
+        result = run_size(font_size, args.strings, args.repeats)
+        report['results'].append(result)
+        print(f'{font_size:>3}px (mean ms per string)  font.render {result["font_render_ms"]["mean"]:.4f}'
+              f'  glyph atlas {result["glyph_atlas_ms"]["mean"]:.4f}'
+              f'  composed {result["atlas_composed"]:.0%}', file=sys.stderr)
+    pygame.quit()
+    json.dump(report, sys.stdout, indent=2)
+    print()
+    return report
+
+
+if __name__ == '__main__':
+    main()
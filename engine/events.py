@@ -0,0 +1,88 @@
+"""Prepare the pygame events of each frame before Scene.handle_events.
+
+To use in the main loop:
+  dispatcher = EventDispatcher(time_budget=8)
+  dispatcher.dispatch(scene, pygame.event.get())
+Redundant events are removed by coalesce_events(events). With a time budget
+(in milliseconds), events not handled within the budget are kept and handled
+in the next frame, so a burst of input cannot delay drawing for long.
+"""
+
+import time
+import pygame
+
+# Event types where only the last event of the frame needs to be handled
+REPEATED_EVENTS = tuple(getattr(pygame, name) for name in (
+    'VIDEOEXPOSE', 'VIDEORESIZE', 'WINDOWEXPOSED', 'WINDOWRESIZED', 'WINDOWSIZECHANGED')
+    if hasattr(pygame, name))
+
+def coalesce_events(events) -> list:
+    """Returns a list of the events where each run of consecutive MOUSEMOTION
+    events with the same buttons pressed is replaced by a single event, at
+    the last position with the summed rel. Only the last of the events in
+    REPEATED_EVENTS of each type is kept. Other events are kept in order."""
+    coalesced = []
+    last_repeated = {}
+    motion = motion_rel = None  # the last motion event and its summed rel
+    for event in events:
+        if event.type == pygame.MOUSEMOTION:
+            if motion is not None and event.dict.get('buttons') == motion.dict.get('buttons'):
+                rel = event.dict.get('rel', (0, 0))
+                motion_rel = motion_rel[0] + rel[0], motion_rel[1] + rel[1]
+                motion = event
+                continue
+            coalesced.append(_merge_motion(motion, motion_rel))
+            motion, motion_rel = event, tuple(event.dict.get('rel', (0, 0)))
+            continue
+        coalesced.append(_merge_motion(motion, motion_rel))
+        motion = None
+        if event.type in REPEATED_EVENTS:
+            last_repeated[event.type] = len(coalesced)
+        coalesced.append(event)
+    coalesced.append(_merge_motion(motion, motion_rel))
+
+    if last_repeated:
+        return [event for i, event in enumerate(coalesced) if event is not None and (
+            event.type not in last_repeated or last_repeated[event.type] == i)]
+    return [event for event in coalesced if event is not None]
+
+def _merge_motion(motion, rel):
+    """The motion event, with rel replaced if it differs (None if no event)."""
+    if motion is None or tuple(motion.dict.get('rel', (0, 0))) == rel:
+        return motion
+    return pygame.event.Event(pygame.MOUSEMOTION, dict(motion.dict, rel=rel))
+
+class EventDispatcher:
+    """Passes coalesced events to Scene.handle_events in chunks of up to
+    chunk_size events. If time_budget (milliseconds) is not None, at least one
+    chunk is handled each frame and the events remaining after the budget is
+    used are kept in pending, to be handled first in the next frame.
+    Pending events are dropped if the scene changes, as they were meant for
+    the previous scene."""
+    def __init__(self, time_budget=None, chunk_size=16):
+        self.time_budget = time_budget
+        self.chunk_size = max(1, chunk_size)
+        self.pending = []
+        self.pending_scene = None  # the scene the pending events are for
+
+    def dispatch(self, scene, events) -> int:
+        """Handle the pending events (if for the same scene) and then the
+        events. Returns the number of events handled."""
+        pending = self.pending if scene is self.pending_scene else []
+        events = coalesce_events(pending + list(events))
+        self.pending, self.pending_scene = [], None
+        if self.time_budget is None:
+            scene.handle_events(events)
+            return len(events)
+
+        deadline = time.perf_counter() + self.time_budget / 1000
+        handled = 0
+        while True:  # always call handle_events, even with no events
+            chunk = events[handled:handled + self.chunk_size]
+            scene.handle_events(chunk)
+            handled += len(chunk)
+            if handled >= len(events):
+                return handled
+            if time.perf_counter() > deadline:
+                self.pending, self.pending_scene = events[handled:], scene
+                return handled
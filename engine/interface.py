@@ -1,8 +1,13 @@
 import pygame
 from pygame.locals import MOUSEMOTION, MOUSEBUTTONDOWN, MOUSEBUTTONUP, KEYDOWN, KEYUP
 from math import sqrt
+from collections.abc import MutableMapping
+import weakref
 
 from .node import SpriteNode, NodeProps
+from .spatial_grid import mouse_hit_test
+from .spacing_index import SpacingIndex
+from .virtual_tiles import VirtualTiles
 import engine.text as text
 
 MOUSE_EVENTS = (MOUSEMOTION, MOUSEBUTTONDOWN, MOUSEBUTTONUP)
@@ -42,6 +47,135 @@ def saturate_color(color, saturation: float):
 class State:
     idle, hovered, selected, locked = range(4)
 
+def _typed_key(value):
+    """Internal function to make a key of a value that also compares its type
+    (and the types of the items of a tuple), as 1 == 1.0 == True."""
+    if type(value) is tuple:
+        return tuple, tuple(_typed_key(item) for item in value)
+    return type(value), value
+
+class StyleDict(dict):
+    """The dictionary of a Style, holding the keys it overrides in its parent
+    StyleDict (if not None). Any change to it clears the values that Styles
+    resolved from it and from the StyleDicts layered on it."""
+    def __init__(self, *args, parent=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.parent = parent
+        self.resolved = {}
+        self.state_tables = {}
+        self.children = weakref.WeakValueDictionary()  # by id, to clear when changed
+        self.layers = weakref.WeakValueDictionary()  # interned children by their items
+        if parent is not None:
+            parent.children[id(self)] = self
+
+    def changed(self):
+        self.resolved.clear()
+        self.state_tables.clear()
+        for child in list(self.children.values()):
+            child.changed()
+
+    def lookup(self, name: str):
+        """The value of the key name in this or a parent StyleDict, or Style.NO_VALUE."""
+        style_dict = self
+        while style_dict is not None:
+            if name in style_dict:
+                return dict.__getitem__(style_dict, name)
+            style_dict = style_dict.parent
+        return Style.NO_VALUE
+
+    def flattened(self) -> dict:
+        """The keys of this and every parent StyleDict, as a dict."""
+        if self.parent is None:
+            return dict(self)
+        return {**self.parent.flattened(), **self}
+
+    def layer(self, overrides: dict):
+        """A StyleDict of the overrides with this as its parent. Layers of
+        equal overrides are the same StyleDict, if their values are hashable."""
+        try:
+            key = frozenset((name, _typed_key(value)) for name, value in overrides.items())
+        except TypeError:
+            return StyleDict(overrides, parent=self)
+        style_dict = self.layers.get(key)
+        if style_dict is None:
+            style_dict = self.layers[key] = StyleDict(overrides, parent=self)
+        return style_dict
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self.changed()
+
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        self.changed()
+
+    def __ior__(self, other):
+        result = super().__ior__(other)
+        self.changed()
+        return result
+
+    def update(self, *args, **kwargs):
+        super().update(*args, **kwargs)
+        self.changed()
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self.changed()
+        return super().setdefault(key, default)
+
+    def pop(self, *args):
+        self.changed()
+        return super().pop(*args)
+
+    def popitem(self):
+        self.changed()
+        return super().popitem()
+
+    def clear(self):
+        super().clear()
+        self.changed()
+
+class StyleView(MutableMapping):
+    """The keys of a Style, including those of the styles it is layered on,
+    as a dictionary. Setting or deleting a key changes only the Style.
+    copy() returns a dict of the keys, as dict.copy() does."""
+    def __init__(self, style):
+        self._style = style
+
+    def __getitem__(self, name: str):
+        value = self._style._dict.lookup(name)
+        if value is Style.NO_VALUE:
+            raise KeyError(name)
+        return value
+
+    def __setitem__(self, name: str, value):
+        self._style.overrides[name] = value
+
+    def __delitem__(self, name: str):
+        overrides = self._style.overrides
+        if name not in overrides and name in self:
+            raise KeyError(f'{name} is a key of the style this style is layered on')
+        del overrides[name]
+
+    def __contains__(self, name) -> bool:
+        return self._style._dict.lookup(name) is not Style.NO_VALUE
+
+    def __iter__(self):
+        return iter(self._style._dict.flattened())
+
+    def __len__(self) -> int:
+        return len(self._style._dict.flattened())
+
+    def __repr__(self) -> str:
+        return repr(self._style._dict.flattened())
+
+    def copy(self) -> dict:
+        return self._style._dict.flattened()
+
+    def clear(self):
+        """Deletes the keys of the Style, but not of the styles it is layered on."""
+        self._style.overrides.clear()
+
 class Style:
     """Behaves like a dictionary, usually used to hold graphical attributes.
     Interface classes may use a Style and/or keyword arguments, for example:
@@ -53,17 +187,40 @@ class Style:
     Every Style includes default values for 'color', 'background' and 'font'.
     Keys of the form 'base_first_second' default to 'base_first' then 'base'.
     The modifiers 'hovered', 'selected', 'locked' are special cases of this.
+    Resolved keys are remembered until Style.dict changes.
+
+    A Style with keyword arguments as well as a style is layered on that
+    style: it holds only the keyword arguments and changes to the style
+    apply to it. Style.dict has the keys of both, and Style.overrides only
+    the keyword arguments. Layers with equal keyword arguments share their
+    keys until one of them is changed or layered on, which copies its keys.
     """
     state_modifier = '', '_hovered', '_selected', '_locked'
     NO_VALUE = object()
 
     def __init__(self, **kwargs):
-        self.dict = {'color': COLOR_DEFAULT, 'background': BACKGROUND_DEFAULT,
-                     'font': text.FONT_DEFAULT}
-        self.dict.update(kwargs)
+        self._dict = StyleDict({'color': COLOR_DEFAULT, 'background': BACKGROUND_DEFAULT,
+                                'font': text.FONT_DEFAULT})
+        self._dict.update(kwargs)
+        self._shared = False
+        self._view = StyleView(self)
 
     def __repr__(self) -> str:
-        return f'Style({str(self.dict)[1:-1].replace(": ", "=")})'
+        return f'Style({str(self._dict.flattened())[1:-1].replace(": ", "=")})'
+
+    @property
+    def dict(self) -> StyleView:
+        """The keys of this style and the styles it is layered on."""
+        return self._view
+
+    @property
+    def overrides(self) -> StyleDict:
+        """The keys of this style (not including those of the style it is
+        layered on), copied first if they are shared with other styles."""
+        if self._shared:
+            self._dict = StyleDict(self._dict, parent=self._dict.parent)
+            self._shared = False
+        return self._dict
 
     @classmethod
     def from_kwargs(cls, kwargs):
@@ -72,30 +229,65 @@ class Style:
 
         style = kwargs.pop('style')
         if kwargs:
-            style_copy = cls(**style.dict)
-            style_copy.dict.update(kwargs)
-            return style_copy
+            return style.layer(kwargs)
         else:
             return style
 
+    def layer(self, overrides: dict):
+        """A Style of the overrides layered on this style."""
+        layer = Style.__new__(type(self))
+        layer._dict = self.overrides.layer(overrides)  # not layered on a shared dict
+        layer._shared = True
+        layer._view = StyleView(layer)
+        return layer
+
     def get(self, name: str, default=None):
-        if name in self.dict:
-            return self.dict[name]
-        elif '_' in name:
+        value = self.resolve(name)
+        if value is not Style.NO_VALUE:
+            return value
+        elif default is not Style.NO_VALUE:
+            return self._modified_default(name, default)
+        raise KeyError(f'Not a key and not a modifier of a key: {name} in {self!r}')
+
+    def resolve(self, name: str):
+        """The value of the key name, or Style.NO_VALUE if neither it nor
+        a key it is a modifier of is in the style."""
+        resolved = self._dict.resolved
+        if name in resolved:
+            return resolved[name]
+
+        value = self._dict.lookup(name)
+        if value is Style.NO_VALUE and '_' in name:
             base_name, modifier = name.rsplit('_', 1)
-            value = self.get(base_name, default)
+            value = self.resolve(base_name)
             if isinstance(value, pygame.Color) or isinstance(value, tuple):
                 value = self.modified_color(value, modifier, base_name)
-            return value
-        elif default is not Style.NO_VALUE:
+        resolved[name] = value
+        return value
+
+    def _modified_default(self, name: str, default):
+        """The default, modified like a value of the key name would be."""
+        if '_' not in name:
             return default
-        raise KeyError(f'Not a key and not a modifier of a key: {name} in {self.dict}')
+        base_name, modifier = name.rsplit('_', 1)
+        value = self._modified_default(base_name, default)
+        if isinstance(value, pygame.Color) or isinstance(value, tuple):
+            value = self.modified_color(value, modifier, base_name)
+        return value
 
     def __index__(self, name: str):
         return self.get(name, Style.NO_VALUE)
 
+    def state_table(self, base_name: str) -> tuple:
+        """The values of base_name for each State, in order."""
+        state_tables = self._dict.state_tables
+        if base_name not in state_tables:
+            state_tables[base_name] = tuple(self.get(base_name + modifier, Style.NO_VALUE)
+                                            for modifier in self.state_modifier)
+        return state_tables[base_name]
+
     def get_by_state(self, base_name: str, state: int):
-        return self.get(base_name + self.state_modifier[state], Style.NO_VALUE)
+        return self.state_table(base_name)[state]
 
     @staticmethod
     def modified_color(color, modifier, base_name):
@@ -129,6 +321,7 @@ class Button(SpriteNode):
         return text.render(self.message, self.style.get('font'),
                            self.style.get('color'), save_sprite=True)
 
+    @mouse_hit_test
     def event(self, event):
         """Pass each pygame mouse event to the button,
         so it can update (i.e. if hovered or clicked).
@@ -156,6 +349,9 @@ class Button(SpriteNode):
         if last_state != self.state:
             self.dirty = 1
 
+    def mouse_captured(self) -> bool:
+        return self.state in (State.hovered, State.selected)
+
     def on_click(self):
         if callable(self.callback):
             self.callback()
@@ -227,6 +423,10 @@ class TextEntry(SpriteNode):
         if callable(self.edit_callback):
             self.edit_callback(self.text)
 
+    def mouse_captured(self) -> bool:
+        return self.state in (State.hovered, State.selected)
+
+    @mouse_hit_test
     def event(self, event):
         if self.state == State.locked or not self._visible:
             return
@@ -299,6 +499,17 @@ class ListLayout(SpriteNode):
     Add tiles by passing a generator or iterable to the grid, either on initialisation,
     or by calling ListLayout.append_tiles(tiles). Or modify ListLayout.tiles,
     then call ListLayout.prepare_flags() with no arguments.
+    The spacings of tiles are kept in a SpacingIndex, which finds tiles by position
+    quickly. Tiles appended to the list are added to it, but after changing the
+    spacing of a tile, call ListLayout.tile_resized(index), and after replacing,
+    inserting or removing tiles, call ListLayout.tiles_changed(index) with the
+    first index changed.
+    For many rows, pass tiles=VirtualTiles(length, factory, spacing=spacing) to
+    make only the tiles in view (see engine.virtual_tiles).
+    Setting dirty draws every tile in view. After scrolling, call scrolled()
+    instead to shift the image and draw only the tiles scrolled into view,
+    and after changing the image of a tile, call redraw_tile(index), which
+    only updates the area of the tile on the screen.
     Takes the keyword argument background, or a style object, specifying the
     background color. This may be set to None for a transparent background.
     """
@@ -307,16 +518,46 @@ class ListLayout(SpriteNode):
         self.style = Style.from_kwargs(kwargs)
         self.scroll_pixels = 0
         self.tiles = []
+        self._spacing_index = SpacingIndex()
+        self._spacing_tiles = self.tiles
         self.horizontal = horizontal
         self.use_update_method = self.use_draw_method = self.use_image = False
+        self._drawn_scroll = None  # scroll_pixels when the image was drawn
+        self._redraw_tiles = set()
         self.append_tiles(tiles)
 
+    @property
+    def dirty(self):
+        return self._dirty
+
+    @dirty.setter
+    def dirty(self, dirty):
+        self._dirty = dirty
+        if dirty:
+            self._redraw = True
+
+    def scrolled(self):
+        """Marks the layout to be drawn after scroll_pixels changes."""
+        if self._dirty < 2:
+            self._dirty = 1
+
+    def redraw_tile(self, index: int):
+        """Marks the tile at the index to be drawn again, without the other tiles."""
+        self._redraw_tiles.add(index)
+
     def append_tiles(self, tiles=None):
         """Sets use_update_method and use_draw_method. If an iterable/generator
         tiles is supplied, adds each of its elements to the list layout. Format:
         (class_name, *args, {**kwargs}) -> class_name(*args, **kwargs)
+        If tiles is a VirtualTiles, it replaces the tiles. Unless the spacing is
+        uniform (a UniformListLayout), it must have spacing(index).
         """
-        if tiles is not None:
+        if isinstance(tiles, VirtualTiles):
+            if tiles.spacing is None and not isinstance(self, UniformListLayout):
+                raise ValueError('The VirtualTiles of a ListLayout must have spacing(index), otherwise '
+                                 f'every tile is made to find its spacing (got {tiles}) ({self})')
+            self.tiles = tiles
+        elif tiles is not None:
             for (inst_class, *args, kwargs) in tiles:
                 self.tiles.append(inst_class(*args, **kwargs))
         if self.tiles:
@@ -332,49 +573,148 @@ class ListLayout(SpriteNode):
     def update(self):
         super().update()
         if self.use_update_method:
-            for tile in self.tiles:
+            tiles = self.tiles.materialized() if isinstance(self.tiles, VirtualTiles) else self.tiles
+            for tile in tiles:
                 tile.update()
 
     def draw(self):
         super().draw()
-        if self._visible and self.dirty > 0:
-            if self.style.get('background') is not None:
-                self.image.fill(self.style.get('background'))
-            else:
-                self.image.fill(BACKGROUND_TRANSPARENT)
-
+        if self._visible and (self.dirty > 0 or self._redraw_tiles):
             indexes = self.indexes_in_view()
-            if self.use_draw_method:
-                for i in indexes:
+            if isinstance(self.tiles, VirtualTiles):
+                self.tiles.set_view(indexes)
+            if self.dirty == 0 and self._drawn_scroll == self.scroll_pixels:
+                # Only update the areas of the tiles drawn on the screen
+                for rect in self._draw_redraw_tiles(indexes):
+                    self.add_dirty_rect(rect)
+            elif self._redraw or self.use_draw_method or not self._draw_scrolled(indexes):
+                if self.dirty == 0:
+                    self.dirty = 1
+                if self.use_draw_method:
+                    for i in indexes:
+                        self.tiles[i].draw()
+                self._draw_tiles(indexes)
+            self._drawn_scroll = self.scroll_pixels
+            self._redraw = False
+            self._redraw_tiles.clear()
+
+    def _draw_scrolled(self, indexes) -> bool:
+        """Shifts the image by the change in scroll_pixels, then draws the
+        uncovered area and the tiles to redraw. Returns False if the whole
+        image must be drawn instead."""
+        if self._drawn_scroll is None or self.scroll_pixels != int(self.scroll_pixels):
+            return False
+        scrolled = int(self.scroll_pixels - self._drawn_scroll)
+        max_forward = self.image.get_width() if self.horizontal else self.image.get_height()
+        if abs(scrolled) >= max_forward:
+            return False
+
+        if scrolled:
+            self.image.scroll(*self.forward_to_position(-scrolled))
+            if scrolled > 0:
+                self._draw_tiles(indexes, max_forward - scrolled, max_forward)
+            else:
+                self._draw_tiles(indexes, 0, -scrolled)
+        self._draw_redraw_tiles(indexes)
+        return True
+
+    def _draw_redraw_tiles(self, indexes) -> list:
+        """Draws the tiles to redraw that are in view. Returns the rects drawn."""
+        rects = []
+        for i in self._redraw_tiles:
+            if i in indexes:
+                if self.use_draw_method:
                     self.tiles[i].draw()
-            # Blit each of the tiles' images to the grid in place
-            if self.use_image:
-                for i, position in zip(indexes, self.tile_positions(indexes.start)):
-                    self.image.blit(self.get_tile_image(self.tiles[i]), position)
+                rects.append(self._draw_tiles(indexes, self.index_to_forward(i), self.index_to_forward(i + 1)))
+        return rects
+
+    def _draw_tiles(self, indexes, start_forward=None, end_forward=None) -> pygame.Rect:
+        """Fills the image between the forwards (all of it if None) with the
+        background and blits the tiles of the indexes there. Returns the rect filled."""
+        area = self.image.get_rect()
+        if start_forward is not None:
+            area = area.clip(self.forward_to_rect(start_forward, max(0, end_forward - start_forward)))
+            if not area:
+                return area
+            self.image.set_clip(area)
+            indexes = range(max(indexes.start, self.forward_to_index(start_forward)),
+                            min(indexes.stop, self.forward_to_index(end_forward - 1) + 1))
+        if self.style.get('background') is not None:
+            self.image.fill(self.style.get('background'))
+        else:
+            self.image.fill(BACKGROUND_TRANSPARENT)
+
+        # Blit each of the tiles' images to the grid in place
+        if self.use_image:
+            for i, position in zip(indexes, self.tile_positions(indexes.start)):
+                self.image.blit(self.get_tile_image(self.tiles[i]), position)
+        self.image.set_clip(None)
+        return area
 
     def pop_tile(self, index):
-        if self.dirty < 2:
-            self.dirty = 1
+        index = range(len(self.tiles))[index]
+        self._spacings_changed(index)
         return self.tiles.pop(index)
 
     def clear_tiles(self):
+        self.tiles_changed()
+        self.tiles.clear()
+
+    def tiles_changed(self, start_index=0):
+        """Updates the spacings of the tiles from the start index onwards."""
+        self._spacings_changed(start_index)
+        if isinstance(self.tiles, VirtualTiles):
+            self.tiles.refresh(start_index)
+
+    def tile_resized(self, index: int):
+        """Updates the spacing of the tile at the index, after only it changed."""
         if self.dirty < 2:
             self.dirty = 1
-        self.tiles.clear()
+        index = range(len(self.tiles))[index]
+        if self._spacing_tiles is self.tiles and index < len(self._spacing_index):
+            self._spacing_index.set(index, self._tile_spacing(index))
+
+    def _spacings_changed(self, start_index):
+        """Internal method to mark the layout to be drawn and remove the
+        spacings from the start index onwards, to be found again when used."""
+        if self.dirty < 2:
+            self.dirty = 1
+        self._spacing_index.truncate(start_index)
+
+    @property
+    def spacing_index(self) -> SpacingIndex:
+        """The SpacingIndex of the tiles, after adding any appended tiles."""
+        spacing_index = self._spacing_index
+        if self._spacing_tiles is not self.tiles or len(spacing_index) > len(self.tiles):
+            spacing_index = self._spacing_index = SpacingIndex()
+            self._spacing_tiles = self.tiles
+        for i in range(len(spacing_index), len(self.tiles)):
+            spacing_index.append(self._tile_spacing(i))
+        return spacing_index
+
+    def _tile_spacing(self, index: int):
+        """Internal method to get the spacing of the tile at the index,
+        without making it for VirtualTiles given spacing(index)."""
+        if isinstance(self.tiles, VirtualTiles) and self.tiles.spacing is not None:
+            return self.tiles.spacing(index)
+        return self.get_tile_spacing(self.tiles[index])
 
     def indexes_in_view(self):
         """Returns a range() for the indexes of tiles visible when drawn."""
-        max_forward = self.transform.height if self.horizontal else self.transform.width
-        i = forward = 0
-        while forward < self.scroll_pixels:
-            forward += self.get_tile_spacing(self.tiles[i])
-            i += 1
-        start = i
-        while forward < max_forward + self.scroll_pixels and i < len(self.tiles):
-            forward += self.get_tile_spacing(self.tiles[i])
-            i += 1
+        max_forward = self.transform.width if self.horizontal else self.transform.height
+        spacing_index = self.spacing_index
+        start = spacing_index.bisect_right(self.scroll_pixels)  # includes a partially visible tile
+        end = max(start, self._first_index_reaching(spacing_index, max_forward + self.scroll_pixels))
         # Adds 1 to end to include the partially visible next tile
-        return range(start, min(i + 1, len(self.tiles)))
+        return range(start, min(end + 1, len(self.tiles)))
+
+    @staticmethod
+    def _first_index_reaching(spacing_index, forward) -> int:
+        """The least index of a tile whose forward is at least forward,
+        where the index after the last tile is counted."""
+        if forward <= 0:
+            return 0
+        return min(spacing_index.bisect_left(forward) + 1, len(spacing_index))
 
     def get_tile_spacing(self, tile):
         if self.horizontal:
@@ -401,10 +741,7 @@ class ListLayout(SpriteNode):
 
     def index_to_forward(self, index: int):
         """A forward is the number of pixels along in the orientation direction."""
-        forward = -self.scroll_pixels
-        for i in range(min(index, len(self.tiles))):
-            forward += self.get_tile_spacing(self.tiles[i])
-        return forward
+        return self.spacing_index.prefix(min(index, len(self.tiles))) - self.scroll_pixels
 
     def forward_to_position(self, forward_pixels=0) -> tuple:
         """A forward is the number of pixels along in the orientation direction."""
@@ -429,19 +766,14 @@ class ListLayout(SpriteNode):
 
     def forward_to_index(self, forward: float) -> int:
         """A forward is the number of pixels along in the orientation direction."""
-        forward += self.scroll_pixels
-        for i, tile in enumerate(self.tiles):
-            forward -= self.get_tile_spacing(tile)
-            if forward < 0:
-                return i
-        return len(self.tiles)
+        return self.spacing_index.bisect_right(forward + self.scroll_pixels)
 
     def position_to_index(self, position_x_y: (float, float)) -> int:
         return self.forward_to_index(position_x_y[not self.horizontal])
 
     @property
     def scroll_limits(self):
-        return 0, self.index_to_forward(len(self.tiles)) + self.scroll_pixels
+        return 0, self.spacing_index.total
 
 class UniformListLayout(ListLayout):
     """A container that draws a list of tiles, ignoring their position attributes,
@@ -457,11 +789,10 @@ class UniformListLayout(ListLayout):
     """
     def __init__(self, node_props, groups, horizontal=False, spacing=20, tiles=None, **kwargs):
         super().__init__(node_props, groups, horizontal, tiles, **kwargs)
-        self.style = Style.from_kwargs(kwargs)
         self.spacing = spacing
 
     def indexes_in_view(self):
-        max_forward = self.transform.height if self.horizontal else self.transform.width
+        max_forward = self.transform.width if self.horizontal else self.transform.height
         start = self.scroll_pixels // self.spacing
         end = (self.scroll_pixels + max_forward) // self.spacing
         # Adds 1 to end to include the partially visible next tile
@@ -533,6 +864,8 @@ class SpriteListLayout(ListLayout):
     or by calling ListLayout.append_tiles(tiles). Or modify ListLayout.tiles,
     then call ListLayout.prepare_flags() with no arguments.
     The nodes are assigned to its Group rather than the scene LayeredDirty.
+    Resizing the transform of a node updates its spacing, without calling
+    ListLayout.tile_resized(index).
     Takes the keyword argument background, or a style object, specifying the
     background color. This may be set to None for a transparent background.
     """
@@ -540,6 +873,9 @@ class SpriteListLayout(ListLayout):
 
     def __init__(self, node_props, groups, tiles=None, horizontal=False, **kwargs):
         self.tiles_group = pygame.sprite.LayeredDirty()
+        self._resized_tiles = set()
+        self._tile_indexes = {}  # the index of each tile, found again if not correct
+        self._observed_tiles = weakref.WeakSet()  # tiles that report when resized
         super().__init__(node_props, groups, horizontal, tiles=tiles, **kwargs)
         if self.style.get('background') is not None:
             self.image.fill(self.style.get('background'))
@@ -570,27 +906,90 @@ class SpriteListLayout(ListLayout):
             self.prepare_flags()
 
     def pop_tile(self, index):
-        if self.dirty < 2:
-            self.dirty = 1
+        self.tiles_changed(range(len(self.tiles))[index])
         tile = self.tiles[index]
         tile.remove()
+        self._tile_indexes.pop(tile, None)
         return tile
 
     def clear_tiles(self):
+        self.tiles_changed()
+        self.clear_children()
+        self._tile_indexes.clear()
+
+    @property
+    def spacing_index(self) -> SpacingIndex:
+        if self._resized_tiles:
+            self._resync_resized_tiles()
+        return super().spacing_index
+
+    def _tile_spacing(self, index: int):
+        tile = self.tiles[index]
+        if tile not in self._observed_tiles:
+            self._observe_resizes(tile)
+        return self.get_tile_spacing(tile)
+
+    def _observe_resizes(self, tile):
+        """Internal method to wrap the on_resize() method of the tile, once its
+        spacing is used, so that it is updated when the tile is resized."""
+        self._observed_tiles.add(tile)
+        on_resize = tile.on_resize
+
+        def observed_on_resize():
+            on_resize()
+            if tile.parent is self:
+                self._child_resized(tile)
+        tile.on_resize = observed_on_resize
+
+    def _child_resized(self, child):
+        """Internal method called by a tile when its transform is resized,
+        so that its spacing is updated when the spacings are next used."""
+        self._resized_tiles.add(child)
         if self.dirty < 2:
             self.dirty = 1
-        while self.tiles:
-            self.tiles[0].remove()
+
+    def _resync_resized_tiles(self):
+        """Internal method to update the spacings of the resized tiles.
+        The indexes of the tiles are found again (in a single pass over the
+        tiles) only if the tiles changed since they were last found."""
+        resized, self._resized_tiles = self._resized_tiles, set()
+        if self._spacing_tiles is not self.tiles:
+            return  # the spacings are all found again
+        spacing_index = self._spacing_index
+        indexes_found = False
+        for tile in resized:
+            index = self._tile_index(tile)
+            if index is None and not indexes_found:
+                self._tile_indexes = {tile: index for index, tile in enumerate(self.tiles)}
+                indexes_found = True
+                index = self._tile_index(tile)
+            if index is not None and index < len(spacing_index):
+                spacing_index.set(index, self._tile_spacing(index))
+
+    def _tile_index(self, tile):
+        """Internal method to get the index of the tile, or None if it is not
+        known or the tile is no longer at that index."""
+        index = self._tile_indexes.get(tile)
+        if index is None or index >= len(self.tiles) or self.tiles[index] is not tile:
+            return None
+        return index
 
     def draw(self):
         if self._visible:
-            if self.dirty > 0 or self.tiles_group.draw(self.image):
-                self._position_tiles()
-                if self.dirty < 2:
-                    self.dirty = 1
-                if self.use_draw_method:
-                    for node in self.nodes:
-                        node.draw()
+            changed_rects = None
+            if self.dirty == 0:
+                changed_rects = self.tiles_group.draw(self.image)
+                if not changed_rects:
+                    return
+            self._position_tiles()
+            if self.dirty == 0:  # only update the areas of the changed tiles on the screen
+                for rect in changed_rects:
+                    self.add_dirty_rect(rect)
+            elif self.dirty < 2:
+                self.dirty = 1
+            if self.use_draw_method:
+                for node in self.nodes:
+                    node.draw()
 
     # These method differs from the base method as it does not cascade to children
     def _set_rect_position(self, x, y):
@@ -644,8 +1043,11 @@ class Scrollbar(SpriteNode):
             else:
                 self.state = State.locked
 
-        if self.parent.dirty < 2 and pixels != 0:
-            self.parent.dirty = 1
+        if pixels != 0:
+            if hasattr(self.parent, 'scrolled'):
+                self.parent.scrolled()
+            elif self.parent.dirty < 2:
+                self.parent.dirty = 1
 
     def scroll_to(self, pixels):
         self.scroll_by(pixels - self.parent.scroll_pixels)
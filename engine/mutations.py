@@ -0,0 +1,94 @@
+"""A log of the changes to the nodes of a scene, so that views of the tree
+(such as the editor tabs) update from the changes once per frame instead of
+checking every node.
+
+  subscription = scene.mutations.subscribe()
+  ...  # once per frame
+  for kind, node in subscription.drain():
+      if kind == Mutation.added:
+          ...
+  scene.mutations.unsubscribe(subscription)  # when no longer needed
+
+Changes are only recorded while there are subscriptions. A subscription
+with a limit that is not drained often enough (for example, by a disabled
+tab) stops recording when full, and drain() returns None instead, so that
+the view updates from the whole tree.
+"""
+
+class Mutation:
+    """The kinds of change to a node, recorded with the node:
+    added - the node was added to the scene
+    removed - the node and its child nodes were removed from the scene
+    reordered - the node was moved in the node list of its parent, or to a new parent
+    transform - the transform of the node changed (for nodes stored in a
+                TransformArray, the on-screen rect changed when resolved)
+    enabled - the node was enabled or disabled, or shown or hidden by a parent node
+    groups - the sprite node was added to or removed from a group"""
+    added, removed, reordered, transform, enabled, groups = range(6)
+
+
+class MutationSubscription:
+    """The changes recorded since the last drain(). Each kind of change to
+    a node is recorded once, in the order it first happened.
+    After drain(), positions holds the index of each added or reordered
+    node (by id) in the node list of its parent when it last changed. It is
+    out of date if that node list changed again, so check it before use."""
+    def __init__(self, limit=None):
+        self.limit = limit
+        self.overflowed = False  # set when more than limit changes were recorded
+        self.mutations = []
+        self.positions = {}
+        self._positions = {}
+        self._recorded = set()
+
+    def __len__(self) -> int:
+        return len(self.mutations)
+
+    def record(self, kind: int, node, position=None):
+        if self.overflowed:
+            return
+        key = kind, id(node)
+        if key not in self._recorded:
+            if self.limit is not None and len(self.mutations) >= self.limit:
+                self.overflowed = True  # release the recorded nodes
+                self.mutations, self._positions = [], {}
+                self._recorded.clear()
+                return
+            self._recorded.add(key)
+            self.mutations.append((kind, node))
+        if position is not None:
+            self._positions[id(node)] = position
+
+    def drain(self):
+        """Return the (kind, node) changes recorded, and clear them.
+        Returns None if more than limit changes were recorded since last drained."""
+        if self.overflowed:
+            self.overflowed = False
+            self.positions = {}
+            return None
+        mutations, self.mutations = self.mutations, []
+        self.positions, self._positions = self._positions, {}
+        self._recorded.clear()
+        return mutations
+
+
+class MutationLog:
+    """Records the changes to the nodes of a scene for each subscription."""
+    def __init__(self):
+        self.subscriptions = []
+
+    def subscribe(self, limit=None) -> MutationSubscription:
+        """Start recording changes for a new subscription, of at most limit
+        changes between drains if not None."""
+        subscription = MutationSubscription(limit)
+        self.subscriptions.append(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: MutationSubscription):
+        self.subscriptions.remove(subscription)
+
+    def record(self, kind: int, node, position=None):
+        """Record a change to the node, given its position in the node list
+        of its parent if it was added or reordered there."""
+        for subscription in self.subscriptions:
+            subscription.record(kind, node, position)
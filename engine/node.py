@@ -1,5 +1,7 @@
 import pygame
+from contextlib import contextmanager
 from typing import NamedTuple
+from .mutations import Mutation
 
 _NODE_VALUE_WARNING = (
     '\nThis may be because the "parent" (argument 0) in NodeProps was missed.'
@@ -23,14 +25,21 @@ class Anchor:
     center = middle = 0.5
     bottom = right = 1.0
 
+_POSITION_NAMES = 'x', 'y', 'position', 'transform'
+_SIZE_NAMES = 'width', 'height', 'size', 'transform'
+
 class Transform:
     """A data structure that stores position, size and relative anchor position.
-    Every node will hold an instance of this class as Node.transform."""
-    __slots__ = 'x', 'y', 'width', 'height', '_anchor_horizontal', '_anchor_vertical', '_transform_update'
+    Every node will hold an instance of this class as Node.transform.
+    The observer _transform_update(name) is called with the name of the changed
+    attribute, or 'position', 'size' or 'transform' (both) for combined changes."""
+    __slots__ = ('x', 'y', 'width', 'height', '_anchor_horizontal', '_anchor_vertical',
+                 '_transform_update', '_batch_changes')
 
     def __init__(self, x: float, y: float, width=0, height=0,
                  anchor_horizontal=Anchor.left, anchor_vertical=Anchor.top, transform_update=None):
         self._transform_update = None
+        self._batch_changes = None  # set of changed names while in a batch
         self.x = x
         self.y = y
         self.width = width
@@ -69,7 +78,58 @@ class Transform:
     def __setattr__(self, name, val):
         object.__setattr__(self, name, val)
         if name in ('x', 'y', 'width', 'height') and self._transform_update is not None:
-            self._transform_update(name)
+            self._changed(name)
+
+    def _changed(self, name):
+        """Internal method to notify the observer, or record the change if batched."""
+        if self._transform_update is not None:
+            if self._batch_changes is None:
+                self._transform_update(name)
+            else:
+                self._batch_changes.add(name)
+
+    @contextmanager
+    def batch(self):
+        """Combine the changes made inside a with block, so that the observer
+        (the node) is updated once at the end, at most resizing once:
+          with node.transform.batch():
+              node.transform.x, node.transform.width = 10, 40
+        Nested batches are combined into the outermost batch.
+        """
+        if self._batch_changes is not None:
+            yield self
+            return
+        object.__setattr__(self, '_batch_changes', set())
+        try:
+            yield self
+        finally:
+            changes = self._batch_changes
+            object.__setattr__(self, '_batch_changes', None)
+            moved = any(name in changes for name in _POSITION_NAMES)
+            resized = any(name in changes for name in _SIZE_NAMES)
+            if moved and resized:
+                self._changed('transform')
+            elif moved:
+                self._changed('position')
+            elif resized:
+                self._changed('size')
+
+    def set(self, x=None, y=None, width=None, height=None, anchor=None):
+        """Set any of the given attributes with a single update of the observer.
+        The anchor (horizontal, vertical) is set first and keeps the rectangle
+        in place, then the size is set about the new anchor and then x and y
+        set the position of the anchor point."""
+        with self.batch():
+            if anchor is not None:
+                self.anchor_horizontal, self.anchor_vertical = anchor
+            if width is not None:
+                self.width = width
+            if height is not None:
+                self.height = height
+            if x is not None:
+                self.x = x
+            if y is not None:
+                self.y = y
 
     # Getters and setters for transform properties
     @property
@@ -78,9 +138,10 @@ class Transform:
 
     @position.setter
     def position(self, position_x_y: (float, float)):
-        # Set the first attribute directly so only one _transform_update is used
+        # Set the attributes directly so only one _transform_update is used
         object.__setattr__(self, 'x', position_x_y[0])
-        self.y = position_x_y[1]
+        object.__setattr__(self, 'y', position_x_y[1])
+        self._changed('position')
 
     @property
     def size(self) -> (int, int):
@@ -88,9 +149,10 @@ class Transform:
 
     @size.setter
     def size(self, width_height: (int, int)):
-        # Set the first attribute directly so only one _transform_update is used
+        # Set the attributes directly so only one _transform_update is used
         object.__setattr__(self, 'width', width_height[0])
-        self.height = width_height[1]
+        object.__setattr__(self, 'height', width_height[1])
+        self._changed('size')
 
     def get_surface_size(self) -> (int, int):
         return max(0, min(8192, self.width)), max(0, min(8192, self.height))
@@ -129,31 +191,64 @@ class Transform:
 
 
 class Node:
+    _mouse_indexed = False  # set while in the mouse_grid of the scene
+
     def __init__(self, node_props: NodeProps):
         self.parent = node_props[0]
-        # Check that the supplied node has the necessary attributes to be the parent
-        if not hasattr(self.parent, 'nodes'):
-            raise ValueError('No nodes attribute found on given parent '
-                             f'(got {self.parent}) {_NODE_VALUE_WARNING} ({self})')
-        elif not (hasattr(self.parent, 'rect') or hasattr(self.parent, 'is_origin')):
-            raise ValueError('No rect or is_origin attribute found on given parent '
-                             f'(got {self.parent}) {_NODE_VALUE_WARNING} ({self})')
+        self._check_parent(self.parent)
         self.parent.nodes.append(self)
-        self.transform = Transform(*node_props[1:7], transform_update=self._transform_update)
+        self.transform = self._create_transform(node_props[1:7])
         self._enabled = node_props[7]
+        self._transform_dirty = 0
         self.nodes = []
+        self._set_ancestry()
+        self._tree_changed(Mutation.added, position=len(self.parent.nodes) - 1)
+        # If any parent node is disabled then its child nodes are not visible
+        self._visible = self.world_visible()
 
-        if hasattr(self, 'event_handler'):
-            self.scene().add_event_handler(self)
         # Get screen co-ordinates, shift position to be relative to the parent node
-        self.rect = self.transform.rect()
-        if not hasattr(self.parent, 'is_origin'):
-            self.rect.move_ip(self.parent.rect.x, self.parent.rect.y)
-        else:
-            # Optimise method call if at top-level - position is not relative to any node
-            self.global_rect = self.transform.rect
+        self.rect = self.global_rect()
+        if hasattr(self.transform, 'storage'):
+            self.transform.storage.bind(self.transform.index, self, self.rect)
+        if hasattr(self, 'event_handler'):
+            self._scene.add_event_handler(self)
         self.nodes = []
 
+    def _check_parent(self, parent):
+        """Internal method to check that the supplied node has the necessary
+        attributes to be the parent."""
+        if not hasattr(parent, 'nodes'):
+            raise ValueError('No nodes attribute found on given parent '
+                             f'(got {parent}) {_NODE_VALUE_WARNING} ({self})')
+        elif not (hasattr(parent, 'rect') or hasattr(parent, 'is_origin')):
+            raise ValueError('No rect or is_origin attribute found on given parent '
+                             f'(got {parent}) {_NODE_VALUE_WARNING} ({self})')
+
+    def _tree_changed(self, kind: int, scene=None, position=None):
+        """Internal method to record a change to the nodes of the scene, such as
+        adding, removing, reordering, enabling or showing nodes, in the
+        mutations of the scene (or the given scene), with the position of
+        the node in the node list of its parent if it was added or moved."""
+        _record_mutation(self._scene if scene is None else scene, kind, self, position)
+
+    def _parent_transform_storage(self):
+        """Internal method to get the array storage used by the parent node
+        or scene for transforms, or None if not used."""
+        if isinstance(self.parent, Node):
+            return getattr(self.parent.transform, 'storage', None)
+        else:
+            return getattr(self.parent, 'transform_storage', None)
+
+    def _create_transform(self, transform_values):
+        """Internal method to create a transform, using array storage
+        if the parent node or scene does."""
+        storage = self._parent_transform_storage()
+        if storage is None:
+            return Transform(*transform_values, transform_update=self._transform_update)
+        parent_index = -1 if hasattr(self.parent, 'is_origin') else self.parent.transform.index
+        return storage.create_transform(parent_index, *transform_values,
+                                        transform_update=self._transform_update)
+
     def update(self):
         # Recursively update child nodes, if not a leaf node (check uses ~0.9x time)
         if self.nodes:
@@ -169,20 +264,39 @@ class Node:
                     child.draw()
 
     def global_rect(self) -> pygame.Rect:
-        """Calculate the on-screen rectangle of a node. Cached as Node.rect."""
-        rect = self.transform.rect()
-        parent = self.parent
-        while not hasattr(parent, 'is_origin'):
-            rect.move_ip(parent.transform.x, parent.transform.y)
-            parent = parent.parent
-        return rect
+        """Calculate the on-screen rectangle of a node from the rect of
+        its parent node. Cached as Node.rect."""
+        x, y = self.transform.x, self.transform.y
+        if not hasattr(self.parent, 'is_origin'):
+            x += self.parent.rect.x
+            y += self.parent.rect.y
+        return pygame.Rect(self.transform.rect_position(x, y), self.transform.get_surface_size())
 
     def scene(self):
         """Get the scene that this node belongs to."""
-        parent = self.parent
-        while isinstance(parent, Node):
-            parent = parent.parent
-        return parent
+        return self._scene
+
+    @property
+    def depth(self) -> int:
+        """The number of parent nodes above this node (0 if top-level)."""
+        return self._depth
+
+    def _set_ancestry(self):
+        """Internal method to store the scene and depth from the parent."""
+        if isinstance(self.parent, Node):
+            self._scene = self.parent._scene
+            self._depth = self.parent._depth + 1
+        else:
+            self._scene = self.parent
+            self._depth = 0
+        if self.nodes:
+            for child in self.nodes:
+                child._set_ancestry()
+
+    def world_visible(self) -> bool:
+        """Determine if the node should be visible, if all its parent nodes are
+        enabled, or otherwise not visible. Cached as SpriteNode.visible."""
+        return bool(self._enabled and getattr(self.parent, '_visible', True))
 
     @property
     def enabled(self) -> bool:
@@ -191,53 +305,129 @@ class Node:
     @enabled.setter
     def enabled(self, set_enable: bool):
         self._enabled = set_enable
-        self._set_visible(set_enable)
+        self._tree_changed(Mutation.enabled)
+        self._set_visible(getattr(self.parent, '_visible', True))
 
     def _transform_update(self, name):
         """Update the rect attribute (on-screen position/size) for this
-        node and all child nodes when its transform is modified."""
+        node and all child nodes when its transform is modified.
+        If the scene sets lazy_transforms, the update is deferred until
+        Scene.resolve_transforms() is called (once per frame before draw)."""
+        moved, resized = name in _POSITION_NAMES, name in _SIZE_NAMES
+        if self._transform_dirty:  # already waiting to be resolved
+            self._transform_dirty |= moved | resized << 1
+            self._record_deferred_transform()
+            return
+        scene = self._scene
+        if getattr(scene, 'lazy_transforms', False):
+            # Bit 1 marks a change in position and bit 2 a change in size
+            self._transform_dirty = moved | resized << 1
+            scene.dirty_transforms.append(self)
+            self._record_deferred_transform()
+            return
+
         if self.rect == self.global_rect():  # no changes to apply
             return
+        _record_mutation(scene, Mutation.transform, self)
 
-        if name in ('width', 'height'):
+        if resized:
             self.on_resize()
 
         # Move the top-left of the rectangle if position changes or
         # the rectangle is resized about a point that is not the top-left
-        if name in ('x', 'y') or (not self.transform.anchor_position == (0, 0)
-                                  and name in ('width', 'height')):
-            x, y = self.transform.x, self.transform.y
-            if not hasattr(self.parent, 'is_origin'):
-                x += self.parent.rect.x
-                y += self.parent.rect.y
-            self._set_rect_position(x, y)
+        if moved or (resized and not self.transform.anchor_position == (0, 0)):
+            self._apply_position()
+
+    def _record_deferred_transform(self):
+        """Internal method to record a transform mutation for a deferred
+        update, if there are subscriptions and it changes the rect."""
+        mutations = getattr(self._scene, 'mutations', None)
+        if mutations is not None and mutations.subscriptions and self.rect != self.global_rect():
+            mutations.record(Mutation.transform, self)
+
+    def _apply_position(self):
+        """Internal method to position this node relative to its parent."""
+        x, y = self.transform.x, self.transform.y
+        if not hasattr(self.parent, 'is_origin'):
+            x += self.parent.rect.x
+            y += self.parent.rect.y
+        self._set_rect_position(x, y)
+
+    def _needs_reposition(self) -> bool:
+        """Internal method to check if the deferred transform update of this
+        node moves it: if moved, or resized about an anchor that is not the
+        top-left (used by lazy_transforms)."""
+        return bool(self._transform_dirty & 1 or (
+            self._transform_dirty & 2 and not self.transform.anchor_position == (0, 0)))
+
+    def _has_repositioning_ancestor(self) -> bool:
+        """Internal method to check if a deferred transform update of a parent
+        node will also reposition this node (used by lazy_transforms)."""
+        parent = self.parent
+        while not hasattr(parent, 'is_origin'):
+            if parent._transform_dirty and parent._needs_reposition():
+                return True
+            parent = parent.parent
+        return False
 
     def on_resize(self):
         self.rect.size = self.transform.get_surface_size()
+        if self._mouse_indexed:
+            self._scene.mouse_grid.update(self)
 
     def _set_visible(self, set_visible: bool):
-        """Internal method to set the visible attribute of child sprites."""
-        if self.nodes:
-            for child in self.nodes:
-                child._set_visible(set_visible)
+        """Internal method to set the visible attribute of child sprites,
+        given whether the parent node is visible."""
+        set_visible = bool(set_visible and self._enabled)
+        if set_visible != self._visible:
+            self._visible = set_visible
+            self._tree_changed(Mutation.enabled)
+            if self.nodes:
+                for child in self.nodes:
+                    child._set_visible(set_visible)
 
     def _set_rect_position(self, x, y):
         """Internal method to set the rect attribute of child nodes."""
         x, y = self.transform.rect_position(x, y)
         self.rect.x, self.rect.y = x, y
+        if self._mouse_indexed:
+            self._scene.mouse_grid.update(self)
         if self.nodes:
             for child in self.nodes:
                 child._set_rect_position(x + child.transform.x, y + child.transform.y)
 
     def remove(self):
         """Fully delete a node and remove it from the tree."""
-        if self in self.parent.nodes:
-            self.parent.nodes.remove(self)
+        remove_subtrees((self,))
+
+    def clear_children(self):
+        """Fully delete all child nodes of this node."""
+        remove_subtrees(self.nodes)
+
+    def _remove_subtree(self, batch):
+        """Internal method to delete this node and its child nodes in post-order.
+        Sprites and event handler nodes (for each scene) are collected in the
+        RemovalBatch so they are removed from their groups and scenes afterwards."""
+        batch.removing.add(self)
+        if self.nodes:
+            overriding_remove = []
+            for child in self.nodes:
+                if type(child).remove is Node.remove:
+                    child._remove_subtree(batch)
+                else:
+                    overriding_remove.append(child)
+            # Call the remove() method of child nodes that override it,
+            # which adds them to the same batch (see remove_subtrees)
+            for child in overriding_remove:
+                child.remove()
+            self.nodes.clear()
         self.transform._transform_update = None
+        if hasattr(self.transform, 'storage'):
+            self.transform.detach()
         if hasattr(self, 'event_handler'):
-            self.scene().remove_event_handler(self)
-        for i in range(len(self.nodes)):
-            self.nodes[0].remove()
+            batch.handler_nodes.setdefault(self._scene, []).append(self)
+        if isinstance(self, pygame.sprite.Sprite):
+            batch.sprites.append(self)
 
     def reorder_before(self, before_node):
         """Move this node before a sibling node in the parent's node list
@@ -251,13 +441,91 @@ class Node:
                   f'but a non-sibling node (got {before_node}) was supplied!')
             raise _error
         parent_nodes.insert(index, self)
+        self._tree_changed(Mutation.reordered, position=index)
 
     def reorder(self, index: int):
         """Move this node before the given index of the parent's node list
         using the list.insert() method. Negative indices from end."""
         parent_nodes = self.parent.nodes
         parent_nodes.remove(self)
-        parent_nodes.insert(self, index)
+        parent_nodes.insert(index, self)
+        self._tree_changed(Mutation.reordered, position=_insert_position(index, len(parent_nodes)))
+
+    def reparent(self, new_parent, index=None):
+        """Move this node and its child nodes to the new parent, a Node or Scene,
+        inserting before the given index of its node list (or at the end).
+        The transform stays relative to the parent. The rects and visibility of
+        the moved nodes are updated, and event handlers are moved to the scene
+        of the new parent. Sprite groups and templates are not changed."""
+        self._check_parent(new_parent)
+        ancestor = new_parent
+        while isinstance(ancestor, Node):
+            if ancestor is self:
+                raise ValueError(f'Cannot move a node (got {self}) into its own child node.')
+            ancestor = ancestor.parent
+
+        old_scene, old_storage = self._scene, getattr(self.transform, 'storage', None)
+        self.parent.nodes.remove(self)
+        if index is None:
+            new_parent.nodes.append(self)
+            position = len(new_parent.nodes) - 1
+        else:
+            new_parent.nodes.insert(index, self)
+            position = _insert_position(index, len(new_parent.nodes))
+        self.parent = new_parent
+        self._set_ancestry()
+
+        # Move the transforms of the subtree to the new parent's storage
+        storage = self._parent_transform_storage()
+        if storage is not old_storage:
+            self._recreate_transforms()
+        elif storage is not None:
+            parent_index = -1 if hasattr(new_parent, 'is_origin') else new_parent.transform.index
+            storage.set_parent(self.transform.index, parent_index)
+
+        if self._scene is not old_scene:
+            self._tree_changed(Mutation.removed, old_scene)
+            self._move_scene(old_scene)
+            self._tree_changed(Mutation.added, position=position)
+        else:
+            self._tree_changed(Mutation.reordered, position=position)
+        if storage is None:
+            self._transform_update('position')
+        self._set_visible(getattr(new_parent, '_visible', True))
+
+    def _recreate_transforms(self):
+        """Internal method to recreate the transforms of this node and its
+        child nodes after moving to a parent that uses different storage."""
+        transform = self.transform
+        if hasattr(transform, 'storage'):
+            transform.detach()
+        self.transform = self._create_transform(
+            (transform.x, transform.y, transform.width, transform.height,
+             transform.anchor_horizontal, transform.anchor_vertical))
+        if hasattr(self.transform, 'storage'):
+            self.transform.storage.bind(self.transform.index, self, self.rect)
+        if self.nodes:
+            for child in self.nodes:
+                child._recreate_transforms()
+
+    def _move_scene(self, old_scene):
+        """Internal method to move the event handlers and deferred transform
+        updates of this node and its child nodes to a new scene."""
+        if hasattr(self, 'event_handler'):
+            old_scene.remove_event_handler(self)
+            self._scene.add_event_handler(self)
+        if self._transform_dirty:
+            if self in getattr(old_scene, 'dirty_transforms', ()):
+                old_scene.dirty_transforms.remove(self)
+            if getattr(self._scene, 'lazy_transforms', False):
+                self._scene.dirty_transforms.append(self)
+            else:
+                if self._transform_dirty & 2:
+                    self.on_resize()
+                self._transform_dirty = 0
+        if self.nodes:
+            for child in self.nodes:
+                child._move_scene(old_scene)
 
 
 class SpriteNode(Node, pygame.sprite.DirtySprite):
@@ -272,9 +540,6 @@ class SpriteNode(Node, pygame.sprite.DirtySprite):
             pygame.sprite.DirtySprite.__init__(self)
 
         Node.__init__(self, node_props)
-        # Show or hide the SpriteNode based on its parent nodes in the tree
-        # If any parent node is disabled then its child nodes are not visible
-        self._visible = self.world_visible()
         surface_size = self.transform.get_surface_size()
 
         if image is None:
@@ -288,33 +553,37 @@ class SpriteNode(Node, pygame.sprite.DirtySprite):
             # Copy the given image and its flags including per-pixel alpha
             self.image = pygame.Surface(surface_size, image.get_flags(), image)
 
-    def remove(self):
-        pygame.sprite.Sprite.kill(self)
-        Node.remove(self)
+    def add_internal(self, group):
+        pygame.sprite.DirtySprite.add_internal(self, group)
+        if hasattr(self, '_scene'):  # not while the sprite is initialised
+            _record_mutation(self._scene, Mutation.groups, self)
 
-    def world_visible(self) -> bool:
-        """Determine if the node should be visible, if all its parent nodes are
-        enabled, or otherwise not visible. Cached as SpriteNode.visible."""
-        visible = self._enabled
-        parent = self.parent
-        while visible and isinstance(parent, Node):
-            visible = getattr(parent, 'visible', True) and parent.enabled
-            parent = parent.parent
-        return visible
+    def remove_internal(self, group):
+        pygame.sprite.DirtySprite.remove_internal(self, group)
+        if self.transform._transform_update is not None:  # not once removed
+            _record_mutation(self._scene, Mutation.groups, self)
 
     def _set_visible(self, set_visible):
-        set_visible = set_visible and self.enabled
-        if set_visible != self._visible:
-            self._visible = set_visible
-            Node._set_visible(self, set_visible)
-            if self.dirty < 2:
-                self.dirty = 1
+        visible = self._visible
+        Node._set_visible(self, set_visible)
+        if visible != self._visible and self.dirty < 2:
+            self.dirty = 1
 
     def _set_rect_position(self, x, y):
         Node._set_rect_position(self, x, y)
         if self.dirty < 2:
             self.dirty = 1
 
+    def add_dirty_rect(self, rect):
+        """Marks a rect of the image (in local coordinates) as changed, so that
+        only that area of the screen is updated, unless the node is dirty.
+        The areas are merged by the groups when drawn."""
+        if self._visible and self.dirty == 0:
+            screen_rect = self.rect.clip(pygame.Rect(rect).move(self.rect.topleft))
+            for group in self.groups():
+                if hasattr(group, 'repaint_rect'):
+                    group.repaint_rect(screen_rect)
+
     def on_resize(self):
         Node.on_resize(self)
         self.image = pygame.Surface(self.transform.get_surface_size(),
@@ -323,3 +592,78 @@ class SpriteNode(Node, pygame.sprite.DirtySprite):
             self.image.fill(self.fill_color)  # repaint fill colour
         if self.dirty < 2:
             self.dirty = 1
+
+
+def _record_mutation(scene, kind: int, node, position=None):
+    """Internal function to record a change to a node in the mutations
+    of its scene, if there are any subscriptions."""
+    mutations = getattr(scene, 'mutations', None)
+    if mutations is not None and mutations.subscriptions:
+        mutations.record(kind, node, position)
+
+def _insert_position(index: int, length: int) -> int:
+    """Internal function to get the index an item inserted with list.insert()
+    at the index is at, in the list of the length after inserting it."""
+    if index < 0:
+        index += length - 1
+    return min(max(index, 0), length - 1)
+
+class RemovalBatch(NamedTuple):
+    """The nodes removed by a call to remove_subtrees(), and their sprites and
+    event handler nodes (for each scene) to remove once all are released."""
+    removing: set
+    sprites: list
+    handler_nodes: dict
+
+def remove_subtrees(nodes):
+    """Fully delete the given nodes and their child nodes, removing them from
+    the tree. The nodes are released in a single pass, then their sprites are
+    removed from each group and their event handlers from each scene together."""
+    nodes = list(nodes)
+    if not nodes:
+        return
+    # The batches of the removals in progress in the scene, if it has them
+    batches = getattr(nodes[0]._scene, '_removal_batches', None)
+    if batches:
+        # Child nodes of a node being removed (from their overridden remove()
+        # methods) are added to its batch, and its node list is cleared later
+        batch = batches[-1]
+        for node in nodes:
+            if node.parent in batch.removing:
+                node._remove_subtree(batch)
+        nodes = [node for node in nodes if node.parent not in batch.removing]
+        if not nodes:
+            return
+    removing = set(nodes)
+    parents = {id(node.parent): node.parent for node in nodes}
+    for parent in parents.values():
+        parent.nodes[:] = [node for node in parent.nodes if node not in removing]
+    for node in nodes:
+        node._tree_changed(Mutation.removed)
+
+    batch = RemovalBatch(set(), [], {})
+    if batches is not None:
+        batches.append(batch)
+    try:
+        for node in nodes:
+            node._remove_subtree(batch)
+    finally:
+        if batches is not None:
+            batches.remove(batch)
+    kill_sprites(batch.sprites)
+    for scene, scene_handler_nodes in batch.handler_nodes.items():
+        if len(scene_handler_nodes) > 1 and hasattr(scene, 'remove_event_handlers'):
+            scene.remove_event_handlers(scene_handler_nodes)
+        else:
+            for node in scene_handler_nodes:
+                scene.remove_event_handler(node)
+
+def kill_sprites(sprites):
+    """Remove each of the sprites from all of its groups, like Sprite.kill(),
+    with one call to Group.remove() for each group."""
+    group_sprites = {}
+    for sprite in sprites:
+        for group in sprite.groups():
+            group_sprites.setdefault(group, []).append(sprite)
+    for group, removing in group_sprites.items():
+        group.remove(*removing)
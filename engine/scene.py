@@ -1,12 +1,33 @@
 import pygame
+from itertools import count
+from .mutations import MutationLog
+from .node import remove_subtrees
+from .spatial_grid import SpatialGrid, MOUSE_POSITION_EVENTS, uses_mouse_hit_test
 from .template import load_nodes, read_local_json
 
 class Scene:
     """Each scene manages the screen, updated and drawn
     once per frame. To switch scene, the new scene flag
     is set to the next scene (detect this in main loop).
+
+    Set lazy_transforms = True to defer updating node rects after a
+    transform changes until the scene is drawn, so that a node moved
+    many times per frame only repositions its child nodes once.
+    Call resolve_transforms() to read up-to-date rects before drawing.
+    To store the transforms of many nodes in NumPy arrays, set
+    transform_storage to an engine.transform_array.TransformArray
+    before creating nodes.
+
+    Mouse events are only passed to event handlers using mouse_hit_test
+    (such as Button) when under the cursor or captured, found using the
+    mouse_grid. Other event handlers receive every event of their types.
+
+    To find which nodes changed (added, removed, reordered, moved, enabled
+    or shown), subscribe to the mutations (an engine.mutations.MutationLog)
+    and drain the subscription once per frame.
     """
     is_origin = 'Scene'
+    lazy_transforms = False
 
     def __init__(self, screen, clock):
         self.screen = screen
@@ -20,6 +41,16 @@ class Scene:
         self.background_color = None
         self.background_surf = None
         self.event_handlers = {}
+        self.mouse_grid = SpatialGrid()
+        self.mouse_captured = set()
+        self._unindexed_handlers = {}  # mouse event handlers not in the mouse_grid
+        self._indexed_types = {}  # mouse event types each node in the mouse_grid is registered for
+        self._handler_order = {}  # orders mouse event handlers by registration
+        self._handler_count = count()
+        self._removal_batches = []  # the RemovalBatch of each node removal in progress
+        self.dirty_transforms = []
+        self.transform_storage = None
+        self.mutations = MutationLog()
 
     def update(self):
         for child in self.nodes:
@@ -27,14 +58,41 @@ class Scene:
                 child.update()
 
     def draw(self):
+        self.resolve_transforms()
         for child in self.nodes:
             child.draw()
         # Use the draw group to draw all sprites if used
         if self.group_draw is not None:
+            self.resolve_transforms()  # apply changes made while drawing
             return self.group_draw.draw(self.screen)
         else:
             return None
 
+    def resolve_transforms(self):
+        """Apply the transform changes deferred by lazy_transforms. Each
+        changed node is resized if needed, then the topmost changed nodes
+        reposition themselves and all child nodes in a single pass.
+        Also updates the rects of nodes using the transform_storage."""
+        if self.transform_storage is not None:
+            self.transform_storage.resolve()
+        if not self.dirty_transforms:
+            return
+        dirty_nodes, self.dirty_transforms = self.dirty_transforms, []
+        # Removed nodes have no _transform_update and are skipped
+        dirty_nodes = [node for node in dirty_nodes if node.transform._transform_update is not None]
+        # Repositioning is needed if moved or resized about an anchor, and
+        # repositioning a node also repositions its child nodes
+        top_nodes = [node for node in dirty_nodes
+                     if node._needs_reposition() and not node._has_repositioning_ancestor()]
+
+        for node in dirty_nodes:
+            if node._transform_dirty & 2:
+                node.on_resize()
+        for node in top_nodes:
+            node._apply_position()
+        for node in dirty_nodes:
+            node._transform_dirty = 0
+
     def add_event_handler(self, node, additional_types=None):
         """The event types to register the node for are its
         event_handler attribute if present plus the additional_types."""
@@ -48,6 +106,21 @@ class Scene:
                 self.event_handlers[event_type] = [node]
             elif node not in handler_list:
                 handler_list.append(node)
+            else:
+                continue
+            if event_type in MOUSE_POSITION_EVENTS:
+                self._add_mouse_handler(node, event_type)
+
+    def _add_mouse_handler(self, node, event_type):
+        if node not in self._handler_order:
+            self._handler_order[node] = next(self._handler_count)
+        if uses_mouse_hit_test(node):
+            self._indexed_types.setdefault(node, set()).add(event_type)
+            if not node._mouse_indexed:
+                node._mouse_indexed = True
+                self.mouse_grid.update(node)
+        else:
+            self._unindexed_handlers.setdefault(event_type, []).append(node)
 
     def remove_event_handler(self, node, additional_types=None):
         """The event types to de-register the node from are its
@@ -59,15 +132,64 @@ class Scene:
         for event_type in event_types:
             if node in self.event_handlers[event_type]:
                 self.event_handlers[event_type].remove(node)
+                if event_type in MOUSE_POSITION_EVENTS:
+                    self._remove_mouse_handler(node, event_type)
             else:
                 print(f'Engine warning: could not find {node} when removing '
                       'its event handler. It may have been deleted already.')
 
+    def _remove_mouse_handler(self, node, event_type):
+        indexed_types = self._indexed_types.get(node, None)
+        if indexed_types is None:
+            self._unindexed_handlers[event_type].remove(node)
+        else:
+            indexed_types.discard(event_type)
+            if not indexed_types:
+                del self._indexed_types[node]
+                self.mouse_grid.remove(node)
+                self.mouse_captured.discard(node)
+                node._mouse_indexed = False
+        if not any(node in self.event_handlers.get(mouse_type, ())
+                   for mouse_type in MOUSE_POSITION_EVENTS):
+            del self._handler_order[node]
+
+    def remove_event_handlers(self, nodes):
+        """De-register each of the nodes from the event types of their
+        event_handler attributes, filtering each handler list once."""
+        removing = set(nodes)
+        event_types = set()
+        for node in nodes:
+            event_types.update(getattr(node, 'event_handler', []))
+        for event_type in event_types:
+            handler_lists = [self.event_handlers.get(event_type, None)]
+            if event_type in MOUSE_POSITION_EVENTS:
+                handler_lists.append(self._unindexed_handlers.get(event_type, None))
+            for handler_list in handler_lists:
+                if handler_list:
+                    handler_list[:] = [node for node in handler_list if node not in removing]
+
+        for node in nodes:
+            if node in self._handler_order:
+                del self._handler_order[node]
+            if node in self._indexed_types:
+                del self._indexed_types[node]
+                self.mouse_grid.remove(node)
+                self.mouse_captured.discard(node)
+                node._mouse_indexed = False
+
+    def clear(self):
+        """Fully delete all nodes in the scene."""
+        remove_subtrees(self.nodes)
+        self.dirty_transforms.clear()
+
     def handle_events(self, pygame_events):
         for event in pygame_events:
             # Redraw screen when restored or resized (minimization clears screen)
             if hasattr(self, 'group_draw') and event.type == pygame.VIDEOEXPOSE:
                 self.resize_draw_group()
+            if event.type in MOUSE_POSITION_EVENTS:
+                self.handle_mouse_event(event)
+                continue
             # Pass events to event handlers using the event method
             event_handler_nodes = self.event_handlers.get(event.type, None)
             if event_handler_nodes:
@@ -75,6 +197,35 @@ class Scene:
                     if node.enabled:
                         node.event(event)
 
+    def handle_mouse_event(self, event):
+        """Pass a mouse event to the event handlers without mouse_hit_test,
+        and to those using it that are under the cursor or captured,
+        in the order they were registered."""
+        indexed_types = self._indexed_types
+        event_handler_nodes = [node for node in self.mouse_grid.query(event.pos)
+                               if event.type in indexed_types[node]]
+        if self.mouse_captured:
+            event_handler_nodes.extend(node for node in self.mouse_captured
+                                       if event.type in indexed_types[node])
+        unindexed_nodes = self._unindexed_handlers.get(event.type, None)
+        if unindexed_nodes:
+            event_handler_nodes.extend(unindexed_nodes)
+        if not event_handler_nodes:
+            return
+        handler_order = self._handler_order
+        event_handler_nodes = sorted(set(event_handler_nodes), key=handler_order.__getitem__)
+
+        for node in event_handler_nodes:
+            if node not in handler_order:
+                continue  # removed by a previous event handler
+            if node.enabled:
+                node.event(event)
+                if node in indexed_types:
+                    if node.mouse_captured():
+                        self.mouse_captured.add(node)
+                    else:
+                        self.mouse_captured.discard(node)
+
     def create_draw_group(self, background_color):
         """Sets self.group_draw to a new LayeredDirty group and fills
         the background surface with the given color.
@@ -0,0 +1,76 @@
+"""The spacings of tiles in a ListLayout, summed in a Fenwick tree, so that the
+position of a tile and the tile at a position are found in O(log n).
+
+  spacings = SpacingIndex([20, 30, 20])
+  spacings.prefix(2) -> 50  # the forward (in pixels) of the tile at index 2
+  spacings.bisect_right(55) -> 2  # the index of the tile at forward 55
+"""
+
+class SpacingIndex:
+    """A list of non-negative spacings, where prefix(count), the sum of the
+    first count spacings, is O(log n). Appending, changing a spacing and
+    removing spacings from the end are also O(log n) per spacing."""
+    def __init__(self, spacings=()):
+        self.spacings = list(spacings)
+        # tree[i] is the sum of the spacings (i - (i & -i), i], one-based
+        self.tree = [0] + self.spacings
+        for i in range(1, len(self.tree)):
+            parent = i + (i & -i)
+            if parent < len(self.tree):
+                self.tree[parent] += self.tree[i]
+
+    def __len__(self) -> int:
+        return len(self.spacings)
+
+    def __getitem__(self, index: int):
+        return self.spacings[index]
+
+    def append(self, spacing):
+        count = len(self.spacings) + 1
+        self.spacings.append(spacing)
+        self.tree.append(spacing + self.prefix(count - 1) - self.prefix(count - (count & -count)))
+
+    def truncate(self, length: int):
+        """Removes the spacings from the index length onwards."""
+        del self.spacings[length:]
+        del self.tree[length + 1:]
+
+    def set(self, index: int, spacing):
+        change = spacing - self.spacings[index]
+        self.spacings[index] = spacing
+        i = index + 1
+        while i < len(self.tree):
+            self.tree[i] += change
+            i += i & -i
+
+    def prefix(self, count: int):
+        """The sum of the first count spacings."""
+        total = 0
+        while count > 0:
+            total += self.tree[count]
+            count -= count & -count
+        return total
+
+    @property
+    def total(self):
+        return self.prefix(len(self.spacings))
+
+    def bisect_left(self, forward) -> int:
+        """The number of prefix sums (from one spacing) less than forward."""
+        return self._descend(forward, False)
+
+    def bisect_right(self, forward) -> int:
+        """The number of prefix sums (from one spacing) up to forward."""
+        return self._descend(forward, True)
+
+    def _descend(self, forward, inclusive: bool) -> int:
+        count = 0
+        step = 1 << (len(self.spacings).bit_length() - 1) if self.spacings else 0
+        while step:
+            next_count = count + step
+            if next_count < len(self.tree) and (
+                    self.tree[next_count] <= forward if inclusive else self.tree[next_count] < forward):
+                count = next_count
+                forward -= self.tree[next_count]
+            step >>= 1
+        return count
@@ -0,0 +1,92 @@
+"""Find the nodes under a point using a uniform grid of their rects.
+
+Used by Scene to pass mouse events only to the event handlers under the
+cursor. To allow this for a node class, decorate its event method:
+  @mouse_hit_test
+  def event(self, event): ...
+and implement mouse_captured(self), returning True while the node must still
+receive mouse events outside of its rect (for example, while hovered so it
+can reset its state when the cursor leaves). Node classes that override the
+decorated event method receive every event again unless they also decorate it.
+"""
+
+import pygame
+
+# Mouse event types with a pos attribute that can be passed by position
+MOUSE_POSITION_EVENTS = (pygame.MOUSEMOTION, pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP)
+
+def mouse_hit_test(event_method):
+    """Decorates an event method that ignores mouse events outside of the node
+    rect (self.rect.collidepoint(event.pos) is False) unless the node's
+    mouse_captured() method returns True."""
+    event_method.mouse_hit_test = True
+    return event_method
+
+def uses_mouse_hit_test(node) -> bool:
+    return getattr(getattr(type(node), 'event', None), 'mouse_hit_test', False)
+
+class SpatialGrid:
+    """Stores each node in the square cells of a grid that its rect overlaps,
+    so that finding the nodes whose rect contains a point only checks the
+    nodes in a single cell. Call update(node) when the node rect changes."""
+    def __init__(self, cell_size=64):
+        self.cell_size = cell_size
+        self.cells = {}
+        self.node_cells = {}  # (left, top, right, bottom) range of cells used by each node
+
+    def __len__(self) -> int:
+        return len(self.node_cells)
+
+    def __contains__(self, node) -> bool:
+        return node in self.node_cells
+
+    def cell_range(self, rect) -> (int, int, int, int):
+        """The inclusive range of cells overlapped by the rect, or None if the
+        rect is empty (an empty rect does not contain any point)."""
+        if rect.width <= 0 or rect.height <= 0:
+            return None
+        size = self.cell_size
+        return rect.x // size, rect.y // size, (rect.right - 1) // size, (rect.bottom - 1) // size
+
+    def update(self, node):
+        """Add the node or move it to the cells overlapped by its rect."""
+        new_range = self.cell_range(node.rect)
+        old_range = self.node_cells.get(node, False)
+        if new_range == old_range:
+            return
+        if old_range:
+            self._discard(node, old_range)
+        self.node_cells[node] = new_range
+        if new_range is not None:
+            cells = self.cells
+            left, top, right, bottom = new_range
+            for cell_x in range(left, right + 1):
+                for cell_y in range(top, bottom + 1):
+                    cell = cells.get((cell_x, cell_y), None)
+                    if cell is None:
+                        cells[cell_x, cell_y] = {node}
+                    else:
+                        cell.add(node)
+
+    def remove(self, node):
+        cell_range = self.node_cells.pop(node, None)
+        if cell_range is not None:
+            self._discard(node, cell_range)
+
+    def _discard(self, node, cell_range):
+        cells = self.cells
+        left, top, right, bottom = cell_range
+        for cell_x in range(left, right + 1):
+            for cell_y in range(top, bottom + 1):
+                cell = cells[cell_x, cell_y]
+                cell.discard(node)
+                if not cell:
+                    del cells[cell_x, cell_y]
+
+    def query(self, position) -> list:
+        """The nodes whose rect contains the position (x, y)."""
+        size = self.cell_size
+        cell = self.cells.get((int(position[0] // size), int(position[1] // size)), None)
+        if cell is None:
+            return []
+        return [node for node in cell if node.rect.collidepoint(position)]
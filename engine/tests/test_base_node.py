@@ -1,7 +1,11 @@
 """Tests the engine.base_node classes Transform, Node and SpriteNode."""
 
 from random import Random
-from engine.node import Transform, Node, SpriteNode, NodeProps
+import pygame
+from engine.node import Transform, Node, SpriteNode, NodeProps, remove_subtrees
+from engine.scene import Scene
+from engine.mutations import Mutation
+from engine.transform_array import TransformArray
 
 def random_transform_values(random):
     return (random.uniform(-999, 999), random.uniform(-999, 999),
@@ -18,7 +22,7 @@ def test_transform():
         Transform(-11, -2, 111.0, 111.0, -1, -1)
     ]
     for i in range(128):
-        test_transforms.append(Transform(,, )
+        test_transforms.append(Transform(*random_transform_values(random)))
 
     print("Test: A transform's 'positive size' has non-negative width and height.")
     for transform in test_transforms:
@@ -45,6 +49,47 @@ def test_transform():
         transform.position = (t_x + random_change_in_x, t_y*2)
         assert transform.x == t_x + random_change_in_x and transform.y == t_y*2
 
+def test_transform_batch():
+    updates = []
+    transform = Transform(0, 0, 10, 10, transform_update=updates.append)
+
+    print('Test: Changes in a transform batch update the observer once.')
+    with transform.batch():
+        transform.x += 5
+        transform.size = (20, 20)
+        with transform.batch():  # nested batches are combined
+            transform.y = 7
+    assert updates == ['transform']
+    assert transform.position == (5, 7) and transform.size == (20, 20)
+    updates.clear()
+    with transform.batch():
+        pass
+    assert updates == []
+
+    print('Test: Transform.set() updates the observer once and keeps the anchor point.')
+    transform.set(width=30, height=40)
+    transform.set(x=1, y=2, width=4, height=6, anchor=(0.5, 0.5))
+    assert updates == ['size', 'transform']
+    assert transform.position == (1, 2) and transform.anchor_position == (0.5, 0.5)
+    assert transform.rect() == (-1, -1, 4, 6)
+
+    class ResizeCountNode(SpriteNode):
+        resize_count = 0
+
+        def on_resize(self):
+            super().on_resize()
+            self.resize_count += 1
+
+    class TestScene:
+        nodes, is_origin = [], 'Scene'
+
+    print('Test: A batch resizes a node at most once and positions it correctly.')
+    a_node = Node(NodeProps(TestScene, 10, 10))
+    spr_node = ResizeCountNode(NodeProps(a_node, 0, 0, 5, 5, 1, 1), [])
+    spr_node.transform.set(x=20, y=30, width=10, height=12)
+    assert spr_node.resize_count == 1
+    assert spr_node.rect == (20, 28, 10, 12) and spr_node.image.get_size() == (10, 12)
+
 def test_node():
     random = Random(1)  # seed ensures consistent random test cases
 
@@ -57,6 +102,9 @@ def test_node():
 
     print("Test: Initialising a node adds it to its parent's nodes.")
     assert len(TestScene.nodes) == len(a_node.nodes) == len(b_node.nodes) == 1
+    print('Test: A node stores the scene it belongs to and its depth in the tree.')
+    assert a_node.scene() is b_node.scene() is b_node.nodes[0].scene() is TestScene
+    assert (a_node.depth, b_node.depth, b_node.nodes[0].depth) == (0, 1, 2)
     print("Test: Removing a node removes it & all child nodes from its parent's nodes.")
     a_node.remove()
     assert len(TestScene.nodes) == len(a_node.nodes) == len(b_node.nodes) == 0
@@ -91,7 +139,313 @@ def test_node():
     spr_node.enabled = True
     assert spr_node.visible
 
+def test_lazy_transforms():
+    random = Random(1)  # seed ensures consistent random test cases
+
+    lazy_scene, eager_scene = Scene(None, None), Scene(None, None)
+    lazy_scene.lazy_transforms = True
+    trees = []
+    for scene in lazy_scene, eager_scene:
+        a_node = Node(NodeProps(scene, 10, 10, 20, 20))
+        b_node = Node(NodeProps(a_node, 5, 5, 10, 10, 0.5, 0.5))
+        c_node = SpriteNode(NodeProps(b_node, 1, 2, 3, 4), [])
+        trees.append((a_node, b_node, c_node))
+
+    print('Test: With lazy_transforms, rects are not changed until resolved.')
+    a_node, b_node, c_node = trees[0]
+    c_rect_before = c_node.rect.copy()
+    a_node.transform.x += 50
+    b_node.transform.width = 30
+    assert c_node.rect == c_rect_before
+    assert len(lazy_scene.dirty_transforms) == 2
+    a_node.transform.y += 1
+    assert len(lazy_scene.dirty_transforms) == 2
+
+    print('Test: Resolved lazy transforms give the same rects as eager transforms.')
+    changes = [(random_transform_values(random)[:2], (random.randint(0, 99), random.randint(0, 99)))
+               for i in range(16)]
+    for a_node, b_node, c_node in trees:
+        a_node.transform.x += 50
+        a_node.transform.y += 1
+        b_node.transform.width = 30
+        for i, (position, size) in enumerate(changes):
+            node = (a_node, b_node, c_node)[i % 3]
+            node.transform.position = position
+            node.transform.size = size
+    lazy_scene.resolve_transforms()
+    assert not lazy_scene.dirty_transforms
+    for lazy_node, eager_node in zip(*trees):
+        assert lazy_node.rect == eager_node.rect
+    assert trees[0][2].image.get_size() == trees[1][2].image.get_size()
+
+    print('Test: A child node moved while its parent is resized (without moving) is repositioned.')
+    for a_node, b_node, c_node in trees:
+        a_node.transform.anchor_position = (0, 0)
+        a_node.transform.width = 30
+        b_node.transform.x = 7
+    lazy_scene.resolve_transforms()
+    for lazy_node, eager_node in zip(*trees):
+        assert lazy_node.rect == eager_node.rect
+
+    print('Test: Removed nodes are skipped when resolving lazy transforms.')
+    a_node, b_node, c_node = trees[0]
+    c_node.transform.x += 1
+    c_node.remove()
+    lazy_scene.resolve_transforms()
+    assert not lazy_scene.dirty_transforms
+
+def test_reparent():
+    class TestScene:
+        nodes, is_origin = [], 'Scene'
+        event_handlers = {}
+
+        @classmethod
+        def add_event_handler(cls, node):
+            cls.event_handlers[node] = True
+
+        @classmethod
+        def remove_event_handler(cls, node):
+            del cls.event_handlers[node]
+
+    class OtherScene(TestScene):
+        nodes, event_handlers = [], {}
+
+    class HandlerNode(Node):
+        event_handler = []
+
+    a_node = Node(NodeProps(TestScene, 10, 20))
+    b_node = Node(NodeProps(TestScene, 100, 200, enabled=False))
+    c_node = SpriteNode(NodeProps(a_node, 1, 2, 4, 4), [])
+    d_node = HandlerNode(NodeProps(c_node, 3, 3))
+
+    print('Test: Reparenting moves a node and its child nodes to the new parent.')
+    c_node.reparent(b_node)
+    assert a_node.nodes == [] and b_node.nodes == [c_node] and c_node.parent is b_node
+    assert c_node.depth == 1 and d_node.depth == 2
+    print('Test: Reparenting updates the rects and visibility of the moved nodes.')
+    assert c_node.rect.topleft == (101, 202) and d_node.rect.topleft == (104, 205)
+    assert not c_node.visible
+    c_node.reparent(TestScene, 0)
+    assert TestScene.nodes[0] is c_node and c_node.depth == 0 and c_node.visible
+    assert c_node.rect.topleft == (1, 2) and d_node.rect.topleft == (4, 5)
+
+    print('Test: Reparenting to another scene moves the event handlers.')
+    d_node.reparent(OtherScene)
+    assert d_node.scene() is OtherScene
+    assert d_node not in TestScene.event_handlers and d_node in OtherScene.event_handlers
+
+    print('Test: A node cannot be moved into its own child node.')
+    e_node = Node(NodeProps(a_node))
+    for new_parent in a_node, e_node:
+        try:
+            a_node.reparent(new_parent)
+            assert False
+        except ValueError:
+            assert a_node.parent is TestScene
+
+    print('Test: Reordering moves a node before the given index.')
+    a_node.reorder(0)
+    assert TestScene.nodes.index(a_node) == 0
+
+def test_remove():
+    screen = pygame.Surface((100, 100))
+    scene = Scene(screen, None)
+    scene.create_draw_group((0, 0, 0))
+
+    class HandlerNode(SpriteNode):
+        event_handler = [pygame.MOUSEBUTTONDOWN]
+
+    class CountingNode(Node):
+        removed = 0
+
+        def remove(self):
+            CountingNode.removed += 1
+            super().remove()
+
+    a_node = Node(NodeProps(scene, 10, 20))
+    b_node = SpriteNode(NodeProps(scene, 1, 2, 4, 4), scene.group_draw)
+    a_children = [HandlerNode(NodeProps(a_node, i, i, 2, 2), scene.group_draw) for i in range(5)]
+    counting_node = CountingNode(NodeProps(a_children[0]))
+    c_node = HandlerNode(NodeProps(counting_node, 1, 1, 2, 2), scene.group_draw)
+
+    print('Test: Removing a node removes its child nodes, sprites and event handlers.')
+    a_node.remove()
+    assert scene.nodes == [b_node] and not a_node.nodes
+    assert scene.group_draw.sprites() == [b_node]
+    assert scene.group_draw.get_layer_of_sprite(b_node) == 0
+    assert not scene.event_handlers[pygame.MOUSEBUTTONDOWN]
+    assert all(not node.alive() for node in a_children + [c_node])
+    assert CountingNode.removed == 1
+
+    print('Test: Child nodes overriding remove() are removed in the same batch.')
+    class CountingList(list):
+        assignments = 0
+
+        def __setitem__(self, index, value):
+            CountingList.assignments += 1
+            super().__setitem__(index, value)
+
+    d_node = Node(NodeProps(scene))
+    d_node.nodes = CountingList()
+    d_children = [CountingNode(NodeProps(d_node)) for i in range(20)]
+    d_grandchildren = [HandlerNode(NodeProps(child, 1, 1, 2, 2), scene.group_draw) for child in d_children]
+    d_node.remove()
+    assert CountingNode.removed == 21 and CountingList.assignments == 0
+    assert not any(node.alive() for node in d_grandchildren)
+    assert not scene.event_handlers[pygame.MOUSEBUTTONDOWN]
+
+    print('Test: A node of the scene may be removed from within the removal of another node.')
+    class RemovingNode(Node):
+        def remove(self):
+            e_node.remove()
+            super().remove()
+
+    e_node = HandlerNode(NodeProps(scene, 1, 1, 2, 2), scene.group_draw)
+    d_node = Node(NodeProps(scene))
+    d_grandchild = HandlerNode(NodeProps(RemovingNode(NodeProps(d_node)), 1, 1, 2, 2), scene.group_draw)
+    d_node.remove()
+    assert d_node not in scene.nodes and e_node not in scene.nodes
+    assert not d_grandchild.alive() and not e_node.alive()
+    assert not scene.event_handlers[pygame.MOUSEBUTTONDOWN]
+
+    print('Test: Removed nodes no longer update when their transform changes.')
+    rect = a_children[1].rect.copy()
+    a_children[1].transform.x += 10
+    assert a_children[1].rect == rect
+
+    print('Test: Clearing deletes all child nodes.')
+    d_node = Node(NodeProps(scene))
+    d_children = [HandlerNode(NodeProps(d_node, i, i, 2, 2), scene.group_draw) for i in range(5)]
+    d_node.clear_children()
+    assert not d_node.nodes and d_node in scene.nodes
+    assert scene.group_draw.sprites() == [b_node]
+    assert not any(node.alive() for node in d_children)
+
+    print('Test: The area of each removed sprite is repainted separately.')
+    scene.group_draw.draw(scene.screen)
+    corners = [SpriteNode(NodeProps(scene, x, y, 2, 2), scene.group_draw) for x, y in ((0, 0), (90, 90))]
+    scene.group_draw.draw(scene.screen)
+    lost_count = len(scene.group_draw.lostsprites)
+    remove_subtrees(corners)
+    assert scene.group_draw.lostsprites[lost_count:] == [corners[0].rect] * 2 + [corners[1].rect] * 2
+
+    print('Test: The batch of a removal is reset if a remove() method fails.')
+    class FailingNode(Node):
+        def remove(self):
+            raise RuntimeError
+
+    f_node = Node(NodeProps(scene))
+    FailingNode(NodeProps(f_node))
+    try:
+        f_node.remove()
+        assert False, 'RuntimeError expected'
+    except RuntimeError:
+        pass
+    assert scene._removal_batches == []
+    g_node = Node(NodeProps(scene))
+    g_child = HandlerNode(NodeProps(g_node, 1, 1, 2, 2), scene.group_draw)
+    g_node.remove()
+    assert not g_child.alive() and g_node not in scene.nodes
+
+    print('Test: Groups other than layered groups remove sprites with remove().')
+    group = pygame.sprite.Group()
+    sprites = [SpriteNode(NodeProps(scene, i, i, 2, 2), [group, scene.group_draw]) for i in range(3)]
+    remove_subtrees(sprites)
+    assert not group.sprites() and not any(sprite.alive() for sprite in sprites)
+
+    print('Test: Clearing a scene deletes all nodes.')
+    scene.clear()
+    assert not scene.nodes and not scene.group_draw.sprites()
+
+def test_mutations():
+    scene, other_scene = Scene(pygame.Surface((100, 100)), None), Scene(pygame.Surface((100, 100)), None)
+    scene.create_draw_group((0, 0, 0))
+    other_group = pygame.sprite.LayeredDirty()
+    Node(NodeProps(scene))  # before subscribing, so not recorded
+    subscription, other_subscription = scene.mutations.subscribe(), other_scene.mutations.subscribe()
+
+    print('Test: Changes to nodes are recorded once each until drained.')
+    a_node = Node(NodeProps(scene))
+    b_node = SpriteNode(NodeProps(scene, 0, 0, 4, 4), scene.group_draw)
+    c_node = Node(NodeProps(a_node))
+    b_node.reorder(0)
+    b_node.reorder_before(a_node)
+    a_node.transform.x = 5
+    a_node.transform.y = 8
+    a_node.enabled = False
+    b_node.add(other_group)
+    assert subscription.drain() == [
+        (Mutation.added, a_node), (Mutation.added, b_node), (Mutation.added, c_node),
+        (Mutation.reordered, b_node), (Mutation.transform, a_node), (Mutation.enabled, a_node),
+        (Mutation.enabled, c_node), (Mutation.groups, b_node)]
+    assert subscription.positions == {id(a_node): 1, id(b_node): 1, id(c_node): 0}  # a_node is at 2 since
+    assert subscription.drain() == [] and subscription.positions == {}
+
+    print('Test: Setting a transform to its current values is not recorded.')
+    a_node.transform.set(5, 8)
+    with a_node.transform.batch():
+        a_node.transform.x = 5
+    assert subscription.drain() == []
+    lazy_scene = Scene(pygame.Surface((100, 100)), None)
+    lazy_scene.lazy_transforms = True
+    lazy_node = Node(NodeProps(lazy_scene, 1, 1, 4, 4))
+    lazy_subscription = lazy_scene.mutations.subscribe()
+    lazy_node.transform.set(1, 1, 4)
+    assert lazy_subscription.drain() == []
+    lazy_node.transform.x = 1
+    lazy_node.transform.y = 2
+    assert lazy_subscription.drain() == [(Mutation.transform, lazy_node)]
+
+    print('Test: Moving and removing nodes is recorded in each scene.')
+    c_node.reparent(b_node)
+    c_node.reparent(other_scene)
+    b_node.remove()
+    assert subscription.drain() == [
+        (Mutation.reordered, c_node), (Mutation.transform, c_node), (Mutation.enabled, c_node),
+        (Mutation.removed, c_node), (Mutation.removed, b_node)]
+    assert other_subscription.drain() == [(Mutation.added, c_node)]  # the rect is unchanged
+    assert other_subscription.positions == {id(c_node): 0}
+    c_node.reorder(-1)
+    d_node = Node(NodeProps(other_scene))
+    d_node.reparent(other_scene, -5)
+    other_subscription.drain()
+    assert other_subscription.positions == {id(c_node): 0, id(d_node): 0}
+    assert other_scene.nodes == [d_node, c_node]  # c_node was moved since
+
+    print('Test: A subscription with a limit stops recording when full, until drained.')
+    limited = scene.mutations.subscribe(limit=2)
+    for i in range(3):
+        Node(NodeProps(scene))
+    assert limited.overflowed and len(limited) == 0
+    assert limited.drain() is None and not limited.overflowed
+    e_node = Node(NodeProps(scene))
+    assert limited.drain() == [(Mutation.added, e_node)]
+    scene.mutations.unsubscribe(limited)
+    subscription.drain()
+
+    print('Test: Changes are not recorded without subscriptions.')
+    scene.mutations.unsubscribe(subscription)
+    Node(NodeProps(scene))
+    assert len(subscription) == 0
+
+    print('Test: Resolved transforms in array storage are recorded.')
+    array_scene = Scene(pygame.Surface((100, 100)), None)
+    array_scene.transform_storage = TransformArray(capacity=4)
+    parent_node = Node(NodeProps(array_scene, 0, 0, 10, 10))
+    child_node = Node(NodeProps(parent_node, 2, 2, 4, 4))
+    array_scene.resolve_transforms()
+    subscription = array_scene.mutations.subscribe()
+    parent_node.transform.x = 7
+    assert len(subscription) == 0
+    array_scene.resolve_transforms()
+    assert subscription.drain() == [(Mutation.transform, parent_node), (Mutation.transform, child_node)]
+
 
 if __name__ == '__main__':
     test_transform()
+    test_transform_batch()
     test_node()
+    test_reparent()
+    test_lazy_transforms()
+    test_remove()
+    test_mutations()
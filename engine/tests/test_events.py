@@ -0,0 +1,71 @@
+"""Tests the engine.events function coalesce_events and class EventDispatcher."""
+
+import pygame
+from engine.events import coalesce_events, EventDispatcher
+
+def motion(position, rel, buttons=(0, 0, 0)):
+    return pygame.event.Event(pygame.MOUSEMOTION, pos=position, rel=rel, buttons=buttons)
+
+def test_coalesce_events():
+    print('Test: Consecutive mouse motion events are merged, summing rel.')
+    events = [motion((1, 1), (1, 1)), motion((3, 2), (2, 1)), motion((4, 4), (1, 2))]
+    coalesced = coalesce_events(events)
+    assert len(coalesced) == 1
+    assert coalesced[0].pos == (4, 4) and coalesced[0].rel == (4, 4)
+    assert coalesce_events(events[:1])[0] is events[0]
+
+    print('Test: Motion events are not merged across other events or changes in buttons.')
+    click = pygame.event.Event(pygame.MOUSEBUTTONDOWN, pos=(3, 2), button=1)
+    events = [motion((1, 1), (1, 1)), motion((3, 2), (2, 1)), click,
+              motion((4, 4), (1, 2), (1, 0, 0)), motion((6, 4), (2, 0)), motion((7, 4), (1, 0))]
+    coalesced = coalesce_events(events)
+    assert [event.type for event in coalesced] == [pygame.MOUSEMOTION, pygame.MOUSEBUTTONDOWN,
+                                                   pygame.MOUSEMOTION, pygame.MOUSEMOTION]
+    assert coalesced[0].rel == (3, 2) and coalesced[1] is click
+    assert coalesced[2] is events[3] and coalesced[3].rel == (3, 0)
+
+    print('Test: Only the last expose and resize events are kept.')
+    resize_1 = pygame.event.Event(pygame.VIDEORESIZE, size=(100, 100), w=100, h=100)
+    resize_2 = pygame.event.Event(pygame.VIDEORESIZE, size=(200, 100), w=200, h=100)
+    expose = pygame.event.Event(pygame.VIDEOEXPOSE)
+    key = pygame.event.Event(pygame.KEYDOWN, key=pygame.K_a, mod=0, unicode='a')
+    coalesced = coalesce_events([expose, resize_1, key, expose, resize_2])
+    assert coalesced == [key, expose, resize_2]
+
+def test_event_dispatcher():
+    class TestScene:
+        def __init__(self):
+            self.handled = []
+
+        def handle_events(self, events):
+            self.handled.append(list(events))
+
+    print('Test: Without a time budget all events are handled at once.')
+    scene = TestScene()
+    keys = [pygame.event.Event(pygame.KEYDOWN, key=i, mod=0, unicode='') for i in range(40)]
+    assert EventDispatcher().dispatch(scene, keys) == 40
+    assert scene.handled == [keys]
+
+    print('Test: Events exceeding the time budget are handled in the next frame.')
+    scene, dispatcher = TestScene(), EventDispatcher(time_budget=0, chunk_size=16)
+    assert dispatcher.dispatch(scene, keys) == 16
+    assert dispatcher.pending == keys[16:]
+    new_key = pygame.event.Event(pygame.KEYDOWN, key=99, mod=0, unicode='')
+    assert dispatcher.dispatch(scene, [new_key]) == 16
+    assert dispatcher.dispatch(scene, []) == 9
+    assert sum(scene.handled, []) == keys + [new_key]
+
+    print('Test: Pending events are dropped when the scene changes.')
+    assert dispatcher.dispatch(scene, keys) == 16 and dispatcher.pending
+    new_scene = TestScene()
+    assert dispatcher.dispatch(new_scene, [new_key]) == 1
+    assert new_scene.handled == [[new_key]] and not dispatcher.pending
+
+    print('Test: The scene handles events every frame, even when there are none.')
+    assert dispatcher.dispatch(scene, []) == 0
+    assert scene.handled[-1] == []
+
+
+if __name__ == '__main__':
+    test_coalesce_events()
+    test_event_dispatcher()
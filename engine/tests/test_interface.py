@@ -0,0 +1,224 @@
+"""Tests the engine.interface classes Style, ListLayout and SpriteListLayout."""
+
+from random import Random
+import pygame
+from engine.node import Transform, NodeProps, SpriteNode
+from engine.scene import Scene
+from engine.interface import Style, State, brighten_color, ListLayout, UniformListLayout, SpriteListLayout
+
+class Tile:
+    def __init__(self, width, height, color):
+        self.transform = Transform(0, 0, width, height)
+        self.image = pygame.Surface((width, height))
+        self.image.fill(color)
+
+def test_style():
+    style = Style(color=(100, 100, 100), background=(40, 40, 40), color_two=(80, 0, 0))
+
+    print('Test: Keys resolve to the value of the key they modify.')
+    assert style.get('background_hovered') == brighten_color((40, 40, 40), -5)
+    assert style.get('color_hovered') == (100, 100, 100)  # not modified for 'color'
+    assert style.get('color_two_hovered') == brighten_color((80, 0, 0), -5)
+    assert style.get('background_first_second') == (40, 40, 40)
+    assert style.get('missing') is None
+    assert style.get('missing_locked', (40, 40, 40)) == style.get('background_locked')
+    try:
+        style.get('missing', Style.NO_VALUE)
+        assert False, 'KeyError expected'
+    except KeyError:
+        pass
+
+    print('Test: Values by state are resolved once, until the style changes.')
+    table = style.state_table('background')
+    assert table == tuple(style.get('background' + modifier) for modifier in Style.state_modifier)
+    assert style.state_table('background') is table
+    assert style.get_by_state('background', State.hovered) == table[State.hovered]
+
+    style.dict['background'] = (60, 60, 60)
+    assert style.get_by_state('background', State.selected) == brighten_color((60, 60, 60), 5)
+    style.dict['background_hovered'] = (0, 0, 0)
+    assert style.get_by_state('background', State.hovered) == (0, 0, 0)
+    del style.dict['background_hovered']
+    assert style.get_by_state('background', State.hovered) == brighten_color((60, 60, 60), -5)
+    style.dict.update(color_two=(0, 80, 0))
+    assert style.get('color_two_locked') == Style.modified_color((0, 80, 0), 'locked', 'color_two')
+    assert style.dict.pop('color_two') == (0, 80, 0)
+    assert style.get('color_two') == (100, 100, 100)
+
+    print('Test: Styles copied with extra keys do not share resolved values.')
+    copy = Style.from_kwargs(dict(style=style, background=(10, 10, 10)))
+    assert copy.get('background') == (10, 10, 10) and style.get('background') == (60, 60, 60)
+    assert Style.from_kwargs(dict(style=style)) is style
+
+def test_style_layers():
+    theme = Style(background=(40, 40, 40), color_scroll=(100, 100, 100))
+
+    print('Test: Styles with equal keyword arguments share one layer on the style.')
+    styles = [Style.from_kwargs(dict(style=theme, background=(30, 36, 36))) for i in range(3)]
+    assert all(style._dict is styles[0]._dict for style in styles)
+    assert styles[0].get('background') == (30, 36, 36)
+    assert styles[0].get('color_scroll_hovered') == theme.get('color_scroll_hovered')
+    assert Style.from_kwargs(dict(style=theme, background=(0, 0, 0)))._dict is not styles[0]._dict
+
+    print('Test: Layers are not shared by equal values of different types.')
+    int_style, bool_style = (Style.from_kwargs(dict(style=theme, toggle=value)) for value in (1, True))
+    assert type(int_style.get('toggle')) is int and type(bool_style.get('toggle')) is bool
+    float_style = Style.from_kwargs(dict(style=theme, background=(30.0, 36, 36)))
+    assert type(float_style.get('background')[0]) is float
+
+    print('Test: Changes to the style apply to its layers.')
+    assert styles[0].get_by_state('color_scroll', State.idle) == (100, 100, 100)
+    theme.dict['color_scroll'] = (120, 120, 120)
+    assert styles[0].get_by_state('color_scroll', State.idle) == (120, 120, 120)
+    theme.dict['background_hovered'] = (1, 2, 3)
+    assert styles[0].get('background_hovered') == (1, 2, 3)  # like a copy of the dict
+
+    print('Test: Changing a shared layer copies it first.')
+    styles[1].dict['color'] = (5, 5, 5)
+    assert styles[1].get('color') == (5, 5, 5) and styles[1].get('background') == (30, 36, 36)
+    assert styles[0].get('color') == theme.get('color') == styles[2].get('color')
+    theme.dict['color_scroll'] = (140, 140, 140)
+    assert styles[1].get('color_scroll') == (140, 140, 140)
+    assert "'background'=(30, 36, 36)" in repr(styles[0]) and 'color_scroll' in repr(styles[0])
+
+    print('Test: The dict of a layer has the keys of the style, and its overrides only its own.')
+    assert styles[0].dict['color_scroll'] == (140, 140, 140) and 'color_scroll' in styles[0].dict
+    assert dict(styles[0].dict) == {**theme.dict, 'background': (30, 36, 36)}
+    assert dict(styles[0].overrides) == {'background': (30, 36, 36)}
+    styles[0].dict['color_scroll'] = (0, 0, 0)
+    assert styles[0].get('color_scroll') == (0, 0, 0) and theme.get('color_scroll') == (140, 140, 140)
+    assert styles[2].overrides == {'background': (30, 36, 36)}
+    del styles[0].dict['color_scroll']
+    assert styles[0].get('color_scroll') == (140, 140, 140)
+    try:
+        del styles[0].dict['color_scroll']
+        assert False, 'KeyError expected'
+    except KeyError:
+        pass
+    styles[0].name = 'layer'  # styles hold other attributes
+
+    print('Test: Changes to a shared layer apply to the styles layered on it.')
+    base = Style(color=(1, 1, 1))
+    shared = [base.layer({'x': 1}) for i in range(2)]
+    assert shared[0]._dict is shared[1]._dict
+    layered = shared[0].layer({'y': 2})
+    shared[0].overrides['color'] = (9, 9, 9)
+    assert shared[0].get('color') == layered.get('color') == (9, 9, 9)
+    assert shared[1].get('color') == base.get('color') == (1, 1, 1)
+    assert layered.get('x') == 1 and layered.get('y') == 2
+
+    print('Test: Style.dict may be used like a dict.')
+    assert layered.dict is layered.dict
+    copied = layered.dict.copy()
+    assert type(copied) is dict and copied == {**base.dict, 'color': (9, 9, 9), 'x': 1, 'y': 2}
+    copied['y'] = 3
+    assert layered.dict.get('y') == 2 and layered.dict.get('z', 0) == 0
+    assert dict(layered.dict.items()) == layered.dict and set(layered.dict.keys()) == set(copied)
+    layered.dict.clear()
+    assert layered.dict == shared[0].dict
+    base.dict.clear()
+    assert not base.dict and base.get('color') is None
+
+def test_list_layout_scroll():
+    scene = Scene(pygame.Surface((300, 300)), None)
+    scene.create_draw_group((0, 0, 0))
+    random = Random(1)  # seed ensures consistent random test cases
+
+    def tiles(uniform):
+        return [(Tile, 90, 20 if uniform else random.randrange(5, 40), (i * 7 % 256, i * 13 % 256, 80), {})
+                for i in range(300)]
+
+    for layout_class, horizontal, kwargs in ((ListLayout, False, {}), (ListLayout, True, {}),
+                                             (UniformListLayout, False, {'spacing': 20})):
+        print(f'Test: Scrolling a {layout_class.__name__} (horizontal: {horizontal}) shifts the image.')
+        list_layout = layout_class(NodeProps(scene, 0, 0, 90, 100), scene.group_draw, horizontal,
+                                   tiles=tiles(layout_class is UniformListLayout), background=(1, 2, 3), **kwargs)
+        list_layout.draw()
+        for i in range(60):
+            list_layout.scroll_pixels = max(0, list_layout.scroll_pixels + random.randint(-30, 40))
+            list_layout.scrolled()
+            if i % 4 == 0:
+                index = random.choice(list_layout.indexes_in_view())
+                list_layout.tiles[index].image.fill((255, 255, 255 - i))
+                list_layout.redraw_tile(index)
+            list_layout.draw()
+            list_layout.dirty = 0
+            drawn = pygame.image.tobytes(list_layout.image, 'RGB')
+            list_layout.dirty = 1
+            list_layout.draw()
+            assert drawn == pygame.image.tobytes(list_layout.image, 'RGB')
+
+def test_list_layout_dirty_rects():
+    scene = Scene(pygame.Surface((300, 300)), None)
+    scene.create_draw_group((0, 0, 0))
+    list_layout = ListLayout(NodeProps(scene, 50, 40, 90, 200), scene.group_draw,
+                             tiles=[(Tile, 90, 20, (i * 20, 60, 60), {}) for i in range(12)])
+    while scene.draw():  # the first frames update the whole screen
+        pass
+
+    print('Test: Redrawing a tile updates only its area of the screen.')
+    list_layout.tiles[3].image.fill((250, 250, 250))
+    list_layout.redraw_tile(3)
+    assert scene.draw() == [pygame.Rect(50, 100, 90, 20)]
+    assert scene.screen.get_at((60, 110)) == (250, 250, 250)
+    assert scene.screen.get_at((60, 95)) == (40, 60, 60)
+    assert scene.draw() == []
+
+    print('Test: Setting dirty updates the whole area.')
+    list_layout.redraw_tile(4)
+    list_layout.dirty = 1
+    assert scene.draw() == [list_layout.rect]
+
+def test_sprite_list_layout_resize():
+    for lazy_transforms in (False, True):
+        scene = Scene(pygame.Surface((300, 300)), None)
+        scene.lazy_transforms = lazy_transforms
+        scene.create_draw_group((0, 0, 0))
+        layout = SpriteListLayout(NodeProps(scene, 0, 0, 90, 100), scene.group_draw,
+                                  tiles=[(SpriteNode, 20, {'fill_color': (i * 20, 60, 60)}) for i in range(12)])
+        scene.draw()
+        assert layout.scroll_limits == (0, 240)
+        assert layout.indexes_in_view() == range(0, 6)
+
+        print(f'Test: Resizing a tile of a SpriteListLayout directly updates its spacing '
+              f'(lazy_transforms: {lazy_transforms}).')
+        layout.tiles[1].transform.height = 50
+        layout.tiles[9].transform.height = 5
+        scene.resolve_transforms()
+        assert layout.scroll_limits == (0, 255)
+        assert layout.indexes_in_view() == range(0, 5)
+        assert layout.position_to_index((0, 75)) == 2
+        scene.draw()
+        assert layout.tiles[2].transform.y == 70
+        assert layout.tiles[11].transform.y == 235
+
+        print('Test: The indexes of resized tiles are found again only after the tiles change.')
+        tile_indexes = layout._tile_indexes
+        layout.tiles[3].transform.height = 30
+        scene.resolve_transforms()
+        assert layout.scroll_limits == (0, 265) and layout._tile_indexes is tile_indexes
+        layout.pop_tile(0)
+        scene.draw()
+        layout.tiles[10].transform.height = 25
+        scene.resolve_transforms()
+        assert layout.scroll_limits == (0, 250)
+        assert layout._tile_indexes[layout.tiles[10]] == 10
+        scene.draw()
+        assert layout.tiles[10].transform.y == 225
+
+        print('Test: Tiles moved out of the layout no longer update its spacings.')
+        moved = layout.tiles[0]
+        moved.reparent(scene)
+        layout.tiles_changed(0)
+        limits = layout.scroll_limits
+        moved.transform.height = 90
+        scene.resolve_transforms()
+        assert layout.scroll_limits == limits and not layout._resized_tiles
+
+
+if __name__ == '__main__':
+    test_style()
+    test_style_layers()
+    test_list_layout_scroll()
+    test_list_layout_dirty_rects()
+    test_sprite_list_layout_resize()
@@ -0,0 +1,98 @@
+"""Tests the engine.spacing_index class SpacingIndex and its use by ListLayout."""
+
+from itertools import accumulate
+from random import Random
+import pygame
+from engine.node import Transform, NodeProps
+from engine.scene import Scene
+from engine.interface import ListLayout
+from engine.spacing_index import SpacingIndex
+
+class Tile:
+    def __init__(self, height):
+        self.transform = Transform(0, 0, 40, height)
+
+def naive_forward_to_index(spacings, forward):
+    for i, spacing in enumerate(spacings):
+        forward -= spacing
+        if forward < 0:
+            return i
+    return len(spacings)
+
+def naive_indexes_in_view(spacings, scroll_pixels, max_forward):
+    i = forward = 0
+    while i < len(spacings) and forward + spacings[i] <= scroll_pixels:
+        forward += spacings[i]
+        i += 1
+    start = i
+    while forward < max_forward + scroll_pixels and i < len(spacings):
+        forward += spacings[i]
+        i += 1
+    return range(start, min(i + 1, len(spacings)))
+
+def test_spacing_index():
+    print('Test: Prefix sums and bisection match summing the spacings.')
+    random = Random(1)  # seed ensures consistent random test cases
+    spacing_index = SpacingIndex(random.choice((0, 5, 20, 31)) for i in range(37))
+    spacings = list(spacing_index.spacings)
+    for i in range(300):
+        operation = random.randrange(4)
+        if operation == 0:
+            spacing = random.randrange(0, 40)
+            spacing_index.append(spacing)
+            spacings.append(spacing)
+        elif operation == 1 and spacings:
+            index, spacing = random.randrange(len(spacings)), random.randrange(0, 40)
+            spacing_index.set(index, spacing)
+            spacings[index] = spacing
+        elif operation == 2:
+            length = random.randrange(len(spacings) + 1)
+            spacing_index.truncate(length)
+            del spacings[length:]
+        prefixes = list(accumulate(spacings))
+        assert [spacing_index.prefix(count) for count in range(len(spacings) + 1)] == [0] + prefixes
+        forward = random.randrange(-10, sum(spacings) + 20)
+        assert spacing_index.bisect_left(forward) == sum(prefix < forward for prefix in prefixes)
+        assert spacing_index.bisect_right(forward) == sum(prefix <= forward for prefix in prefixes)
+    assert SpacingIndex().total == 0 and SpacingIndex().bisect_right(5) == 0
+
+def test_list_layout_queries():
+    scene = Scene(pygame.Surface((300, 300)), None)
+    scene.create_draw_group((0, 0, 0))
+    random = Random(2)
+    list_layout = ListLayout(NodeProps(scene, 0, 0, 120, 100), scene.group_draw,
+                             tiles=((Tile, random.randrange(1, 30), {}) for i in range(200)))
+
+    print('Test: Positions and indexes of tiles match summing their spacings.')
+    for i in range(200):
+        if i % 3 == 0:
+            list_layout.tiles.append(Tile(random.randrange(0, 30)))
+        elif i % 3 == 1:
+            list_layout.pop_tile(random.randrange(-len(list_layout.tiles), len(list_layout.tiles)))
+        else:
+            index = random.randrange(len(list_layout.tiles))
+            list_layout.tiles[index].transform.height = random.randrange(0, 30)
+            spacing_count = len(list_layout.spacing_index)
+            list_layout.tile_resized(index)
+            assert len(list_layout._spacing_index) == spacing_count  # not truncated
+        spacings = [tile.transform.height for tile in list_layout.tiles]
+        list_layout.scroll_pixels = random.randrange(0, sum(spacings))
+        forward = random.randrange(-20, 150)
+        index = random.randrange(len(spacings) + 2)
+        assert list_layout.scroll_limits == (0, sum(spacings))
+        assert list_layout.forward_to_index(forward) == naive_forward_to_index(
+            spacings, forward + list_layout.scroll_pixels)
+        assert list_layout.index_to_forward(index) == sum(spacings[:index]) - list_layout.scroll_pixels
+        assert list_layout.indexes_in_view() == naive_indexes_in_view(
+            spacings, list_layout.scroll_pixels, list_layout.transform.height)
+
+    print('Test: Replacing the tiles list replaces the spacings.')
+    list_layout.tiles = [Tile(10) for i in range(5)]
+    assert list_layout.scroll_limits == (0, 50)
+    list_layout.clear_tiles()
+    assert list_layout.scroll_limits == (0, 0)
+
+
+if __name__ == '__main__':
+    test_spacing_index()
+    test_list_layout_queries()
@@ -0,0 +1,124 @@
+"""Tests the engine.spatial_grid class SpatialGrid and mouse event dispatch in Scene."""
+
+from random import Random
+import pygame
+from engine.node import Node, NodeProps
+from engine.scene import Scene
+from engine.interface import Button, TextEntry, State
+from engine.spatial_grid import SpatialGrid
+
+class FallbackButton(Button):
+    """Overrides the event method, so receives all mouse events."""
+    def event(self, event):
+        super().event(event)
+
+class FallbackTextEntry(TextEntry):
+    def event(self, event):
+        super().event(event)
+
+def random_events(random, count):
+    events = []
+    for i in range(count):
+        position = random.randrange(-20, 300), random.randrange(-20, 300)
+        event_type = random.choice((pygame.MOUSEMOTION,) * 4 + (pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP))
+        if event_type == pygame.MOUSEMOTION:
+            events.append(pygame.event.Event(event_type, pos=position, rel=(0, 0), buttons=(0, 0, 0)))
+        else:
+            events.append(pygame.event.Event(event_type, pos=position, button=random.choice((1, 1, 3))))
+        if i % 5 == 0:  # click without moving
+            events.append(pygame.event.Event(pygame.MOUSEBUTTONDOWN, pos=position, button=1))
+            events.append(pygame.event.Event(pygame.MOUSEBUTTONUP, pos=position, button=1))
+    return events
+
+def build_tree(scene, random, button_class, text_entry_class, clicks):
+    nodes = []
+    for i in range(40):
+        parent = scene if i < 4 else random.choice(nodes)
+        props = NodeProps(parent, random.uniform(-20, 120), random.uniform(-20, 120),
+                          random.randint(0, 60), random.randint(0, 40))
+        if i % 4 == 0:
+            nodes.append(Node(props))
+        elif i % 4 == 3:
+            nodes.append(text_entry_class(props, scene.group_draw))
+        else:
+            nodes.append(button_class(props, scene.group_draw, callback=lambda i=i: clicks.append(i)))
+    return nodes
+
+def test_spatial_grid():
+    print('Test: The grid finds the nodes whose rect contains a point.')
+    random = Random(1)  # seed ensures consistent random test cases
+
+    class RectNode:
+        def __init__(self, rect):
+            self.rect = pygame.Rect(rect)
+
+    grid = SpatialGrid(cell_size=16)
+    rect_nodes = [RectNode((random.randrange(-50, 100), random.randrange(-50, 100),
+                            random.randrange(0, 70), random.randrange(0, 70))) for i in range(50)]
+    for rect_node in rect_nodes:
+        grid.update(rect_node)
+    for i in range(200):
+        if i % 4 == 0:
+            rect_node = random.choice(rect_nodes)
+            rect_node.rect.move_ip(random.randrange(-40, 40), random.randrange(-40, 40))
+            rect_node.rect.width = random.randrange(0, 70)
+            grid.update(rect_node)
+        position = random.randrange(-60, 160), random.randrange(-60, 160)
+        expected = {rect_node for rect_node in rect_nodes if rect_node.rect.collidepoint(position)}
+        assert set(grid.query(position)) == expected
+
+    print('Test: Removed nodes are no longer found.')
+    for rect_node in rect_nodes:
+        grid.remove(rect_node)
+    assert not grid.cells and len(grid) == 0
+
+def test_mouse_dispatch():
+    screen = pygame.Surface((300, 300))
+    random = Random(2)
+    scenes, trees, clicks = [], [], []
+    for button_class, text_entry_class in (Button, TextEntry), (FallbackButton, FallbackTextEntry):
+        scene = Scene(screen, None)
+        scene.create_draw_group((0, 0, 0))
+        scene_clicks = []
+        trees.append(build_tree(scene, Random(3), button_class, text_entry_class, scene_clicks))
+        scenes.append(scene)
+        clicks.append(scene_clicks)
+    indexed_scene, fallback_scene = scenes
+
+    print('Test: Buttons and text entries use the mouse grid, subclasses overriding event do not.')
+    assert len(indexed_scene.mouse_grid) == 30
+    assert len(fallback_scene.mouse_grid) == 0
+
+    print('Test: Passing mouse events by position gives the same result as to all handlers.')
+    for i in range(60):
+        events = random_events(random, 20)
+        index, change_in_x, change_in_y = random.randrange(40), random.randint(-30, 30), random.randint(-30, 30)
+        for scene, nodes in zip(scenes, trees):
+            scene.handle_events(events)
+            nodes[index].transform.position = (nodes[index].transform.x + change_in_x,
+                                               nodes[index].transform.y + change_in_y)
+        for indexed_node, fallback_node in zip(*trees):
+            assert getattr(indexed_node, 'state', None) == getattr(fallback_node, 'state', None)
+        assert clicks[0] == clicks[1]
+    assert clicks[0]  # some buttons were clicked
+
+    print('Test: Locked widgets do not capture the mouse.')
+    for widget_class in (Button, TextEntry):
+        widget = widget_class(NodeProps(indexed_scene, 400, 400, 20, 20), indexed_scene.group_draw)
+        indexed_scene.handle_events([pygame.event.Event(pygame.MOUSEMOTION, pos=(405, 405), rel=(0, 0),
+                                                        buttons=(0, 0, 0))])
+        assert widget in indexed_scene.mouse_captured
+        widget.state = State.locked
+        indexed_scene.handle_events([pygame.event.Event(pygame.MOUSEMOTION, pos=(410, 410), rel=(0, 0),
+                                                        buttons=(0, 0, 0))])
+        assert widget not in indexed_scene.mouse_captured
+
+    print('Test: Removed event handlers are removed from the mouse grid.')
+    for scene in scenes:
+        scene.clear()
+    assert len(indexed_scene.mouse_grid) == 0 and not indexed_scene.mouse_captured
+
+
+if __name__ == '__main__':
+    test_spatial_grid()
+    test_mouse_dispatch()
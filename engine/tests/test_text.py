@@ -0,0 +1,115 @@
+"""Tests the engine.text classes TextCache and GlyphAtlas, as used by render and draw."""
+
+import pygame
+import engine.text as text
+from engine.text import TextCache
+
+def test_text_cache():
+    surfaces = {i: pygame.Surface((10, i + 1)) for i in range(10)}
+    cache = TextCache(max_entries=4, max_bytes=None)
+
+    print('Test: The least recently used surfaces are evicted when full.')
+    for i in range(4):
+        cache.put(i, surfaces[i])
+    assert cache.get(0) is surfaces[0]  # 0 becomes the most recently used
+    cache.put(4, surfaces[4])
+    assert 1 not in cache and all(i in cache for i in (0, 2, 3, 4))
+    assert cache.get(1) is None
+    assert cache.stats()['hits'] == 1 and cache.stats()['misses'] == 1
+    assert cache.stats()['evictions'] == 1
+
+    print('Test: Pinned surfaces are not evicted.')
+    cache.pin(2)
+    for i in range(5, 10):
+        cache.put(i, surfaces[i])
+    assert 2 in cache and len(cache) == 4
+    cache.clear()
+    assert list(cache._surfaces) == [2]
+    cache.unpin(2)
+
+    print('Test: Bytes are counted and limited.')
+    assert cache.bytes == TextCache.surface_bytes(surfaces[2])
+    cache.set_limits(max_entries=None, max_bytes=3 * TextCache.surface_bytes(surfaces[9]))
+    for i in range(10):
+        cache.put(i, surfaces[i])
+    assert cache.bytes <= cache.max_bytes
+    assert cache.bytes == sum(TextCache.surface_bytes(surfaces[i]) for i in cache._surfaces)
+    assert 9 in cache and 0 not in cache
+
+def test_render_cache():
+    print('Test: Rendered text is cached within the limits.')
+    limits = text._sprite_cache.max_entries, text._sprite_cache.max_bytes
+    text.set_cache_limits(max_entries=8)
+    try:
+        pinned = text.pin('Static text')
+        for i in range(20):
+            text.render(f'{i}ms processing / frame')
+        assert text.cache_stats()['entries'] == 8
+        assert text.render('Static text') is pinned
+        assert text.render('19ms processing / frame') is text.render('19ms processing / frame')
+        text.unpin('Static text')
+    finally:
+        text.set_cache_limits(*limits)
+
+def surface_pixels(surface) -> list:
+    return [tuple(surface.get_at((x, y))) for y in range(surface.get_height())
+            for x in range(surface.get_width())]
+
+def test_glyph_atlas():
+    font = pygame.font.Font(None, 24)
+    text.enable_glyph_atlas(font)
+    layout = text._glyph_layouts[font]
+    try:
+        print('Test: Text is composed from glyphs like font.render.')
+        message = ''
+        for char in sorted(layout.characters - {' '}):  # with repeated characters
+            if len(message) < 12 and layout.can_compose(message + char * 2):
+                message += char * 2
+        atlas = text.glyph_atlas(message, font)
+        assert atlas is not None
+        composed = text.render(message, font, save_sprite=False)
+        rendered = font.render(message, True, text.COLOR_DEFAULT)
+        assert composed.get_size() == rendered.get_size() == font.size(message)
+        assert surface_pixels(composed) == surface_pixels(rendered)
+        surface, expected = pygame.Surface((200, 50)), pygame.Surface((200, 50))
+        rect = text.draw(surface, message, (100, 25), font=font, justify=True)
+        assert rect.size == composed.get_size() and abs(rect.centerx - 100) <= 1
+        expected.blit(rendered, rect)
+        assert surface_pixels(surface) == surface_pixels(expected)
+        assert (message, font, *text.COLOR_DEFAULT) not in text._sprite_cache
+
+        print('Test: Text with kerned or unknown characters uses font.render.')
+        assert text.glyph_atlas(message + '\n', font) is None
+        if layout.kerning_pairs:
+            kerned = ''.join(next(iter(layout.kerning_pairs))) * 2
+            assert text.glyph_atlas(kerned, font) is None
+            assert surface_pixels(text.render(kerned, font, save_sprite=False)) \
+                == surface_pixels(font.render(kerned, True, text.COLOR_DEFAULT))
+    finally:
+        text.disable_glyph_atlas(font)
+    assert text.glyph_atlas(message, font) is None
+
+def test_wrap():
+    font = pygame.font.Font(None, 16)
+    words = ('The quick brown fox jumps over the lazy dog, then keeps running '
+             'through extraordinarily long fields of grass.').split()
+    message = ' '.join(words * 3)
+
+    print('Test: Wrapped lines fit the width and the next word would not fit.')
+    for max_width in (40, 100, 180, 450):
+        lines = text.wrap(message, max_width, font)
+        assert ' '.join(lines).split() == message.split()
+        for line, next_line in zip(lines, lines[1:]):
+            assert ' ' not in line or font.size(line)[0] <= max_width
+            assert font.size(line + ' ' + next_line.split()[0])[0] > max_width
+
+    print('Test: Wrapping is cached by message, width and font.')
+    assert text.wrap(message, 180, font) is text.wrap(message, 180, font)
+    assert text.wrap('', 100, font) == ('',)
+
+
+if __name__ == '__main__':
+    test_text_cache()
+    test_render_cache()
+    test_glyph_atlas()
+    test_wrap()
@@ -0,0 +1,76 @@
+"""Tests the engine.transform_array classes TransformArray and ArrayTransform."""
+
+from random import Random
+from engine.node import Node, SpriteNode, NodeProps
+from engine.scene import Scene
+from engine.transform_array import TransformArray, ArrayTransform
+
+def random_tree_values(random, count):
+    """Each node as (parent index or -1 for the scene, *transform values)."""
+    return [(-1 if i < 3 else random.randrange(i), random.uniform(-50, 50), random.uniform(-50, 50),
+             random.randint(0, 40), random.randint(0, 40), random.choice((0, 0.5, 1)),
+             random.choice((0, 0.5))) for i in range(count)]
+
+def build_tree(scene, tree_values):
+    nodes = []
+    for parent_index, *values in tree_values:
+        parent = scene if parent_index < 0 else nodes[parent_index]
+        if len(nodes) % 2:
+            nodes.append(SpriteNode(NodeProps(parent, *values), []))
+        else:
+            nodes.append(Node(NodeProps(parent, *values)))
+    return nodes
+
+def test_transform_array():
+    random = Random(1)  # seed ensures consistent random test cases
+
+    array_scene, eager_scene = Scene(None, None), Scene(None, None)
+    array_scene.transform_storage = TransformArray(capacity=4)
+    tree_values = random_tree_values(random, 60)
+    array_nodes = build_tree(array_scene, tree_values)
+    eager_nodes = build_tree(eager_scene, tree_values)
+
+    print('Test: Nodes in a scene with transform storage use an ArrayTransform.')
+    assert all(isinstance(node.transform, ArrayTransform) for node in array_nodes)
+    assert len(array_scene.transform_storage) == 60
+    change_in_anchor = 0.5 - array_nodes[7].transform.anchor_horizontal
+    for node in array_nodes[7], eager_nodes[7]:
+        node.transform.position = (3, 4)
+        node.transform.anchor_horizontal = 0.5
+        assert node.transform.position == (3 + change_in_anchor * node.transform.width, 4)
+
+    print('Test: Resolved array transforms give the same rects as eager transforms.')
+    for i in range(128):
+        index, change_in_x, width = random.randrange(60), random.uniform(-30, 30), random.randint(0, 50)
+        for nodes in array_nodes, eager_nodes:
+            nodes[index].transform.x += change_in_x
+            nodes[index].transform.width = width
+        array_scene.resolve_transforms()
+        # Reposition all eager nodes, which rounds positions in the same way
+        for eager_node in eager_scene.nodes:
+            eager_node._apply_position()
+        for array_node, eager_node in zip(array_nodes, eager_nodes):
+            assert array_node.rect == eager_node.rect
+            if isinstance(array_node, SpriteNode):
+                assert array_node.image.get_size() == eager_node.image.get_size()
+
+    print('Test: Reparented array transforms give the same rects as eager transforms.')
+    for index, new_parent_index in ((30, 0), (45, 1), (59, 2)):
+        for nodes in array_nodes, eager_nodes:
+            nodes[index].reparent(nodes[new_parent_index])
+    array_scene.resolve_transforms()
+    for array_node, eager_node in zip(array_nodes, eager_nodes):
+        assert array_node.rect == eager_node.rect
+        assert array_scene.transform_storage.depth[array_node.transform.index] == array_node.depth
+
+    print('Test: Removed nodes release their columns and keep their values.')
+    removed_node = array_nodes[2]
+    x_before = removed_node.transform.x
+    removed_node.remove()
+    assert len(array_scene.transform_storage) < 60
+    Node(NodeProps(array_scene, 999, 999))
+    assert removed_node.transform.x == x_before
+
+
+if __name__ == '__main__':
+    test_transform_array()
@@ -0,0 +1,117 @@
+"""Tests the engine.virtual_tiles class VirtualTiles, as used by ListLayout."""
+
+import pygame
+from engine.node import Transform, NodeProps
+from engine.scene import Scene
+from engine.interface import ListLayout, UniformListLayout
+from engine.virtual_tiles import VirtualTiles
+
+class Tile:
+    def __init__(self, height=20):
+        self.transform = Transform(0, 0, 100, height)
+        self.image = pygame.Surface((100, height))
+        self.index = None
+
+def row_height(index):
+    return 10 + index * 7 % 13
+
+def row_color(index):
+    return index * 37 % 256, index * 11 % 256, 90
+
+def make_tile(index, tile=None, uniform=True):
+    height = 20 if uniform else row_height(index)
+    if tile is None or tile.transform.height != height:
+        tile = Tile(height)
+    tile.index = index
+    tile.image.fill(row_color(index))
+    return tile
+
+def draw_scrolled(list_layout, scroll_pixels):
+    list_layout.scroll_pixels = scroll_pixels
+    list_layout.dirty = 1
+    list_layout.draw()
+    return pygame.image.tobytes(list_layout.image, 'RGB')
+
+def test_virtual_tiles():
+    made = []
+
+    def factory(index, tile):
+        made.append(tile is None)
+        return make_tile(index, tile)
+
+    print('Test: Tiles are made when used and reused when out of view.')
+    tiles = VirtualTiles(100000, factory, overscan=2)
+    assert len(tiles) == 100000 and not made
+    assert tiles[5].index == 5 and tiles[-1].index == 99999 and tiles[5] is tiles[5]
+    tiles.set_view(range(10, 20))
+    assert sorted(tiles.tiles) == [] and len(tiles.recycled) == 2
+    assert [tile.index for tile in (tiles[i] for i in range(8, 22))] == list(range(8, 22))
+    assert made.count(True) == 14
+    tiles.set_view(range(50, 60))
+    assert [tiles[i].index for i in range(48, 62)] == list(range(48, 62))
+    assert made.count(True) == 14  # every tile was reused
+    try:
+        tiles[100000]
+        assert False, 'IndexError expected'
+    except IndexError:
+        pass
+
+    print('Test: Refreshed tiles are made again from the rows.')
+    tiles.refresh(55)
+    assert sorted(tiles.tiles) == list(range(48, 55))
+    assert tiles[56].index == 56
+
+def test_virtual_list_layout():
+    scene = Scene(pygame.Surface((300, 300)), None)
+    scene.create_draw_group((0, 0, 0))
+    rows = 3000
+
+    print('Test: A virtual UniformListLayout draws like one with every tile.')
+    made = []
+    virtual = UniformListLayout(NodeProps(scene, 0, 0, 100, 120), scene.group_draw,
+                                tiles=VirtualTiles(rows, lambda i, tile: made.append(i) or make_tile(i, tile)))
+    eager = UniformListLayout(NodeProps(scene, 0, 0, 100, 120), scene.group_draw,
+                              tiles=((make_tile, i, {}) for i in range(rows)))
+    for scroll_pixels in (0, 13, 400, 59000, 1234, 1240):
+        assert draw_scrolled(virtual, scroll_pixels) == draw_scrolled(eager, scroll_pixels)
+        assert len(virtual.tiles.tiles) <= len(virtual.indexes_in_view()) + 2 * virtual.tiles.overscan
+    assert virtual.scroll_limits == eager.scroll_limits
+    assert len(made) < 200
+
+    print('Test: A virtual ListLayout with spacings draws like one with every tile.')
+    virtual = ListLayout(NodeProps(scene, 0, 0, 100, 120), scene.group_draw,
+                         tiles=VirtualTiles(rows, lambda i, tile: make_tile(i, tile, False), spacing=row_height))
+    eager = ListLayout(NodeProps(scene, 0, 0, 100, 120), scene.group_draw,
+                       tiles=((make_tile, i, None, False, {}) for i in range(rows)))
+    assert virtual.scroll_limits == eager.scroll_limits
+    assert list(virtual.tiles.tiles) == [0]  # only the first tile, for ListLayout.prepare_flags
+    for scroll_pixels in (0, 13, 400, 40000, 1234, 1240):
+        assert draw_scrolled(virtual, scroll_pixels) == draw_scrolled(eager, scroll_pixels)
+
+    print('Test: A virtual ListLayout without spacings is not allowed.')
+    try:
+        ListLayout(NodeProps(scene, 0, 0, 100, 120), scene.group_draw, tiles=VirtualTiles(rows, make_tile))
+        assert False, 'ValueError expected'
+    except ValueError:
+        pass
+
+    print('Test: Popping a tile moves the tiles after it back one index.')
+    tiles = VirtualTiles(100, make_tile)
+    assert [tiles[i].index for i in (3, 4, 5)] == [3, 4, 5]
+    assert tiles.pop(4).index == 4 and len(tiles) == 99
+    assert [tiles[i].index for i in (3, 4)] == [3, 5] and tiles.pop(50) is None
+    uniform = UniformListLayout(NodeProps(scene, 0, 0, 100, 120), scene.group_draw,
+                                tiles=VirtualTiles(rows, make_tile))
+    draw_scrolled(uniform, 0)
+    max_scroll = uniform.scroll_limits[1]
+    assert uniform.pop_tile(0).index == 0 and uniform.tiles[0].index == 1
+    assert uniform.scroll_limits[1] == max_scroll - 20
+
+    print('Test: Rows appended to the data source are added to the layout.')
+    virtual.tiles.length += 10
+    assert virtual.scroll_limits[1] == eager.scroll_limits[1] + sum(map(row_height, range(rows, rows + 10)))
+
+
+if __name__ == '__main__':
+    test_virtual_tiles()
+    test_virtual_list_layout()
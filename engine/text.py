@@ -1,4 +1,7 @@
 import pygame
+from collections import OrderedDict
+from functools import lru_cache
+from itertools import accumulate
 from typing import Union
 
 pygame.font.init()
@@ -7,8 +10,189 @@ FONT_DEFAULT = pygame.font.SysFont('Calibri', 16)
 COLOR_DEFAULT = (191, 131, 191)
 BACKGROUND_DEFAULT = (20, 20, 24)
 BOX_PADDING = 5
+ATLAS_CHARACTERS = ''.join(chr(i) for i in range(32, 127))  # printable ASCII
 
-_sprite_cache = {}
+class TextCache:
+    """A cache of rendered text surfaces, limited to max_entries surfaces
+    and max_bytes of pixel data (None for no limit). When full, the least
+    recently used surfaces are removed, except pinned surfaces.
+    The statistics hits, misses and evictions count calls to get and put."""
+    def __init__(self, max_entries=2048, max_bytes=32 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._surfaces = OrderedDict()  # least recently used first
+        self.pinned = set()
+        self.bytes = 0
+        self.hits = self.misses = self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._surfaces)
+
+    def __contains__(self, key) -> bool:
+        return key in self._surfaces
+
+    @staticmethod
+    def surface_bytes(surface: pygame.Surface) -> int:
+        return surface.get_pitch() * surface.get_height()
+
+    def get(self, key):
+        """The surface of the key, or None if it is not in the cache."""
+        surface = self._surfaces.get(key, None)
+        if surface is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self._surfaces.move_to_end(key)
+        return surface
+
+    def put(self, key, surface: pygame.Surface):
+        old_surface = self._surfaces.pop(key, None)
+        if old_surface is not None:
+            self.bytes -= self.surface_bytes(old_surface)
+        self._surfaces[key] = surface
+        self.bytes += self.surface_bytes(surface)
+        self.evict()
+
+    def pin(self, key):
+        """Keep the surface of the key in the cache until unpinned."""
+        self.pinned.add(key)
+
+    def unpin(self, key):
+        self.pinned.discard(key)
+        self.evict()
+
+    def set_limits(self, max_entries=None, max_bytes=None):
+        self.max_entries, self.max_bytes = max_entries, max_bytes
+        self.evict()
+
+    def evict(self):
+        """Remove least recently used surfaces until within the limits."""
+        max_entries, max_bytes, surfaces = self.max_entries, self.max_bytes, self._surfaces
+        skipped = 0  # pinned surfaces moved to the end
+        while ((max_entries is not None and len(surfaces) > max_entries)
+               or (max_bytes is not None and self.bytes > max_bytes)):
+            if skipped >= len(surfaces):
+                return  # only pinned surfaces remain
+            key = next(iter(surfaces))
+            if key in self.pinned:
+                surfaces.move_to_end(key)
+                skipped += 1
+            else:
+                self.bytes -= self.surface_bytes(surfaces.pop(key))
+                self.evictions += 1
+
+    def clear(self):
+        """Remove all surfaces that are not pinned."""
+        for key in [key for key in self._surfaces if key not in self.pinned]:
+            self.bytes -= self.surface_bytes(self._surfaces.pop(key))
+
+    def stats(self) -> dict:
+        return {'entries': len(self._surfaces), 'bytes': self.bytes, 'pinned': len(self.pinned),
+                'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions}
+
+_sprite_cache = TextCache()
+
+class GlyphLayout:
+    """The advance (distance to the next character) and width of each of the
+    characters in a font, and the pairs of characters that are not placed
+    at the advance of the first character when rendered together, such as
+    kerned pairs. Text with these pairs is not composed from separate glyphs.
+    Characters with fractional advances (used by some versions of SDL_ttf)
+    are excluded, since their positions in a line of text cannot be known."""
+    def __init__(self, font: pygame.font.Font, characters=ATLAS_CHARACTERS):
+        self.font = font
+        self.height = font.get_height()
+        self.widths, self.advances = {}, {}
+        for char, metric in zip(characters, font.metrics(characters)):
+            if metric is not None:
+                width, advance = font.size(char)[0], metric[4]
+                if font.size(char * 16)[0] == advance * 15 + width:
+                    self.widths[char], self.advances[char] = width, advance
+        self.characters = frozenset(self.widths)
+        self.kerning_pairs = {(first, second) for first in self.characters for second in self.characters
+                              if font.size(first + second)[0]
+                              != self.advances[first] + self.widths[second]}
+
+    def can_compose(self, message: str) -> bool:
+        return (message != '' and self.characters.issuperset(message)
+                and self.kerning_pairs.isdisjoint(zip(message, message[1:])))
+
+    def positions(self, message: str, x: float = 0) -> list:
+        """The x positions of each character in the message, starting at x."""
+        advances = self.advances
+        return list(accumulate([x] + [advances[char] for char in message[:-1]]))
+
+class GlyphAtlas:
+    """The glyphs of the characters of a GlyphLayout rendered in one color to
+    a single surface, so text is composed with one call to Surface.blits."""
+    def __init__(self, layout: GlyphLayout, color):
+        self.layout = layout
+        self.color = color
+        glyphs = {char: layout.font.render(char, True, color) for char in layout.characters}
+        self.surface = pygame.Surface((sum(glyph.get_width() for glyph in glyphs.values()),
+                                       max(glyph.get_height() for glyph in glyphs.values())),
+                                      pygame.SRCALPHA)
+        self.rects = {}
+        x = 0
+        for char, glyph in glyphs.items():
+            self.rects[char] = self.surface.blit(glyph, (x, 0))
+            x += glyph.get_width()
+
+    def size(self, message: str, positions=None) -> (int, int):
+        if positions is None:
+            positions = self.layout.positions(message)
+        rects = self.rects
+        return (positions[-1] - positions[0] + self.layout.widths[message[-1]],
+                max(rects[char].height for char in message))
+
+    def draw(self, surface, message: str, position: (int, int), justify=False,
+             special_flags=0) -> pygame.Rect:
+        """Blit the glyphs of the message to the surface. Like text.draw."""
+        x, y = position
+        positions = self.layout.positions(message, x)
+        if justify:
+            width, height = self.size(message, positions)
+            if justify is True or justify[0] is True:
+                positions = self.layout.positions(message, x - width / 2)
+            if justify is True or justify[1] is True:
+                y -= height / 2
+        atlas, rects = self.surface, self.rects
+        surface.blits([(atlas, (glyph_x, y), rects[char], special_flags)
+                       for glyph_x, char in zip(positions, message)], False)
+        return pygame.Rect(positions[0], y, *self.size(message, positions)).clip(surface.get_rect())
+
+    def render(self, message: str) -> pygame.Surface:
+        text_sprite = pygame.Surface(self.size(message), pygame.SRCALPHA)
+        text_sprite.fill((*self.color[:3], 0))
+        # Overlapping glyphs keep the greater coverage, as in font.render
+        self.draw(text_sprite, message, (0, 0), special_flags=pygame.BLEND_RGBA_MAX)
+        return text_sprite
+
+_glyph_layouts = {}
+_glyph_atlases = {}
+
+def enable_glyph_atlas(font=FONT_DEFAULT, characters=ATLAS_CHARACTERS):
+    """Render uncached text of the font by composing pre-rendered glyphs,
+    if all characters of the text are in characters and none are kerned.
+    Other text is rendered using font.render."""
+    disable_glyph_atlas(font)
+    _glyph_layouts[font] = GlyphLayout(font, characters)
+
+def disable_glyph_atlas(font=FONT_DEFAULT):
+    _glyph_layouts.pop(font, None)
+    for key in [key for key in _glyph_atlases if key[0] is font]:
+        del _glyph_atlases[key]
+
+def glyph_atlas(message: str, font=FONT_DEFAULT, color=COLOR_DEFAULT):
+    """The GlyphAtlas to compose the message with, or None if the glyph
+    atlas is not enabled for the font or cannot compose the message."""
+    layout = _glyph_layouts.get(font, None)
+    if layout is None or not layout.can_compose(message):
+        return None
+    atlas = _glyph_atlases.get((font, *color), None)
+    if atlas is None:
+        atlas = _glyph_atlases[(font, *color)] = GlyphAtlas(layout, color)
+    return atlas
 
 def draw(surface, message: str, position: (int, int), color=COLOR_DEFAULT, font=FONT_DEFAULT,
          text_sprite=None, static=False, justify: Union[bool, tuple, list] = False) -> pygame.Rect:
@@ -19,6 +203,10 @@ def draw(surface, message: str, position: (int, int), color=COLOR_DEFAULT, font=
     Static - set to True to cache the text sprite (for faster drawing).
     """
     if text_sprite is None:  # render a new surface with text if None supplied
+        if not static and _glyph_layouts and (message, font, *color) not in _sprite_cache:
+            atlas = glyph_atlas(message, font, color)
+            if atlas is not None:
+                return atlas.draw(surface, message, position, justify)
         text_sprite = render(message, font, color, static)
 
     x, y = position  # unpack position so x, y can be translated independently
@@ -38,12 +226,65 @@ def render(message: str, font=FONT_DEFAULT, color=COLOR_DEFAULT, save_sprite=Tru
     text_sprite = _sprite_cache.get((message, font, *color))
 
     if text_sprite is None:
-        text_sprite = font.render(message, True, color)
+        atlas = glyph_atlas(message, font, color) if _glyph_layouts else None
+        if atlas is not None:
+            text_sprite = atlas.render(message)
+        else:
+            text_sprite = font.render(message, True, color)
         if save_sprite:
-            _sprite_cache[(message, font, *color)] = text_sprite
+            _sprite_cache.put((message, font, *color), text_sprite)
 
     return text_sprite
 
+def pin(message: str, font=FONT_DEFAULT, color=COLOR_DEFAULT) -> pygame.Surface:
+    """Render text and keep it in the sprite cache until unpinned,
+    for static text that is drawn often. Return the surface."""
+    _sprite_cache.pin((message, font, *color))
+    return render(message, font, color, save_sprite=True)
+
+def unpin(message: str, font=FONT_DEFAULT, color=COLOR_DEFAULT):
+    _sprite_cache.unpin((message, font, *color))
+
+def cache_stats() -> dict:
+    """The entries, bytes, pinned entries, hits, misses and evictions of the sprite cache."""
+    return _sprite_cache.stats()
+
+def set_cache_limits(max_entries=None, max_bytes=None):
+    """Set the maximum number of surfaces and bytes in the sprite cache (None for no limit)."""
+    _sprite_cache.set_limits(max_entries, max_bytes)
+
+@lru_cache(maxsize=65536)
+def word_width(word: str, font=FONT_DEFAULT) -> int:
+    """The width of the word rendered in the font (cached)."""
+    return font.size(word)[0]
+
+@lru_cache(maxsize=2048)
+def wrap(message: str, max_width: int, font=FONT_DEFAULT) -> tuple:
+    """Split the message into lines no wider than max_width (unless a single
+    word is wider), breaking lines between words. The lines of each message,
+    width and font are cached, so wrapping again after resizing only
+    measures new words. Returns a tuple of lines (at least one line)."""
+    space_width = word_width(' ', font)
+    lines, line_words, line_width = [], [], 0
+    for word in message.split():
+        width = word_width(word, font)
+        if line_words:
+            total_width = line_width + space_width + width
+            # Kerning between words may change the width by a pixel or so,
+            # so measure the whole line when it is close to max_width
+            if abs(total_width - max_width) <= len(line_words):
+                fits = font.size(' '.join(line_words) + ' ' + word)[0] <= max_width
+            else:
+                fits = total_width <= max_width
+            if fits:
+                line_words.append(word)
+                line_width = total_width
+                continue
+            lines.append(' '.join(line_words))
+        line_words, line_width = [word], width
+    lines.append(' '.join(line_words))
+    return tuple(lines)
+
 def box(surface, message: str, position: (int, int), width=None, height=None, middle=False,
         box_color=BACKGROUND_DEFAULT, color=COLOR_DEFAULT, font=FONT_DEFAULT) -> pygame.Rect:
     """Draws (blit) a text box to the surface at the (x, y) position specified.
@@ -0,0 +1,274 @@
+"""Store the transforms of many nodes in contiguous NumPy arrays.
+
+To use, set the transform_storage of a scene before creating its nodes:
+  self.transform_storage = TransformArray()
+Each node created in the scene then holds an ArrayTransform, which is used
+like a Transform. The on-screen rects of all nodes are calculated together
+when the scene is drawn, or when Scene.resolve_transforms() is called.
+"""
+
+import pygame
+from .mutations import Mutation
+from .node import Transform, _record_mutation
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# Rows of TransformArray.data
+X, Y, WIDTH, HEIGHT, ANCHOR_HORIZONTAL, ANCHOR_VERTICAL = range(6)
+
+class TransformArray:
+    """Holds the position, size and anchor of each node in the rows of the
+    array data (one column per node), with the index of its parent node's
+    column in parent (-1 if the parent is a Scene or another origin).
+
+    For fast changes to many nodes, modify the arrays directly, such as
+    storage.x[indexes] += 1 with indexes from node.transform.index,
+    then call storage.mark_changed(). The arrays are replaced when the
+    storage grows, so do not keep references to them between frames.
+    """
+    def __init__(self, capacity=1024):
+        if numpy is None:
+            raise ImportError('TransformArray requires NumPy, which could not be imported.')
+        capacity = max(1, capacity)
+        self.data = numpy.zeros((6, capacity), numpy.float64)
+        self.parent = numpy.full(capacity, -1, numpy.intp)
+        self.depth = numpy.zeros(capacity, numpy.intp)
+        self.alive = numpy.zeros(capacity, numpy.bool_)
+        self.world = numpy.zeros((4, capacity), numpy.int64)  # last rect given to each node
+        self.nodes = [None] * capacity
+        self.changed = False
+        self._count = 0  # columns in use, including released columns
+        self._free = []
+        self._levels = None  # cached column indexes grouped by depth
+
+    def __len__(self) -> int:
+        return self._count - len(self._free)
+
+    # Views of the columns in use
+    @property
+    def x(self):
+        return self.data[X, :self._count]
+
+    @property
+    def y(self):
+        return self.data[Y, :self._count]
+
+    @property
+    def width(self):
+        return self.data[WIDTH, :self._count]
+
+    @property
+    def height(self):
+        return self.data[HEIGHT, :self._count]
+
+    def mark_changed(self):
+        """Resolve the rects of the nodes next time the scene is drawn."""
+        self.changed = True
+
+    def create_transform(self, parent_index: int, x: float, y: float, width=0, height=0,
+                         anchor_horizontal=0.0, anchor_vertical=0.0, transform_update=None):
+        """Allocate a column and return an ArrayTransform using it."""
+        return ArrayTransform(self, self.allocate(parent_index, (x, y, width, height,
+                              anchor_horizontal, anchor_vertical)), transform_update)
+
+    def allocate(self, parent_index: int, values) -> int:
+        if self._free:
+            index = self._free.pop()
+        else:
+            if self._count == len(self.nodes):
+                self._grow()
+            index = self._count
+            self._count += 1
+        self.data[:, index] = values
+        self.parent[index] = parent_index
+        self.depth[index] = 0 if parent_index < 0 else self.depth[parent_index] + 1
+        self.alive[index] = True
+        self.world[:, index] = 0
+        self._levels = None
+        self.changed = True
+        return index
+
+    def bind(self, index: int, node, rect: pygame.Rect):
+        """Set the node that receives the rect calculated for the column."""
+        self.nodes[index] = node
+        self.world[:, index] = rect
+
+    def release(self, index: int):
+        """Free the column of a removed node, for reuse by a new node."""
+        self.alive[index] = False
+        self.nodes[index] = None
+        self._free.append(index)
+        self._levels = None
+
+    def set_parent(self, index: int, parent_index: int):
+        """Change the parent column of a column, updating the depth of the
+        columns of its node's child nodes."""
+        self.parent[index] = parent_index
+        self._levels = None
+        self.changed = True
+        self._set_depth(index, 0 if parent_index < 0 else self.depth[parent_index] + 1)
+
+    def _set_depth(self, index: int, depth: int):
+        self.depth[index] = depth
+        node = self.nodes[index]
+        if node is not None and not hasattr(node, 'is_origin'):
+            for child in node.nodes:
+                if getattr(child.transform, 'storage', None) is self:
+                    self._set_depth(child.transform.index, depth + 1)
+
+    def _grow(self):
+        capacity = len(self.nodes)
+        self.data = numpy.concatenate((self.data, numpy.zeros_like(self.data)), axis=1)
+        self.parent = numpy.concatenate((self.parent, numpy.full(capacity, -1, numpy.intp)))
+        self.depth = numpy.concatenate((self.depth, numpy.zeros_like(self.depth)))
+        self.alive = numpy.concatenate((self.alive, numpy.zeros_like(self.alive)))
+        self.world = numpy.concatenate((self.world, numpy.zeros_like(self.world)), axis=1)
+        self.nodes.extend([None] * capacity)
+
+    def levels(self) -> list:
+        """Column indexes of the nodes in use grouped by depth in the tree,
+        so each group only has parents in the groups before it."""
+        if self._levels is None:
+            columns = numpy.flatnonzero(self.alive[:self._count])
+            depths = self.depth[columns]
+            order = numpy.argsort(depths, kind='stable')
+            columns, depths = columns[order], depths[order]
+            splits = numpy.flatnonzero(numpy.diff(depths)) + 1
+            self._levels = numpy.split(columns, splits) if len(columns) else []
+        return self._levels
+
+    def world_rects(self):
+        """Calculate the on-screen (x, y, width, height) of every column in
+        use, one depth of the tree at a time, as the rows of a new array."""
+        count = self._count
+        x, y, width, height, anchor_horizontal, anchor_vertical = self.data[:, :count]
+        # Top-left position relative to the parent, before rounding
+        local_x = x - width * anchor_horizontal
+        local_y = y - height * anchor_vertical
+        world = numpy.zeros((4, count), numpy.int64)
+        world[2] = numpy.clip(width, 0, 8192)
+        world[3] = numpy.clip(height, 0, 8192)
+        for level in self.levels():
+            parents = self.parent[level]
+            offset_x = numpy.where(parents < 0, 0, world[0, parents])
+            offset_y = numpy.where(parents < 0, 0, world[1, parents])
+            world[0, level] = numpy.trunc(offset_x + local_x[level])
+            world[1, level] = numpy.trunc(offset_y + local_y[level])
+        return world
+
+    def resolve(self):
+        """Update the rect of each node whose on-screen rect has changed."""
+        if not self.changed:
+            return
+        self.changed = False
+        count = self._count
+        world = self.world_rects()
+        differences = (world != self.world[:, :count]) & self.alive[:count]
+        columns = numpy.flatnonzero(differences.any(axis=0))
+        if not len(columns):
+            return
+        resized = (differences[2] | differences[3])[columns].tolist()
+        positions = world[:2, columns].T.tolist()
+        self.world[:, columns] = world[:, columns]
+
+        nodes = self.nodes
+        for index, is_resized, (x, y) in zip(columns.tolist(), resized, positions):
+            node = nodes[index]
+            if is_resized:
+                node.on_resize()
+            node.rect.x, node.rect.y = x, y
+            if node._mouse_indexed:
+                node._scene.mouse_grid.update(node)
+            if getattr(node, 'dirty', 2) < 2:
+                node.dirty = 1
+            _record_mutation(node._scene, Mutation.transform, node)
+
+
+class _DetachedStorage:
+    """Holds the values of an ArrayTransform after its node is removed."""
+    __slots__ = 'data',
+
+    def __init__(self, values):
+        self.data = numpy.array(values, numpy.float64).reshape(6, 1)
+
+    def mark_changed(self):
+        pass
+
+
+class ArrayTransform(Transform):
+    """A Transform that reads and writes a column of a TransformArray.
+    Changes mark the storage as changed, instead of updating the node
+    immediately. The attribute values are returned as float."""
+    __slots__ = 'storage', 'index'
+
+    def __init__(self, storage, index: int, transform_update=None):
+        object.__setattr__(self, '_transform_update', None)
+        object.__setattr__(self, '_batch_changes', None)
+        object.__setattr__(self, 'storage', storage)
+        object.__setattr__(self, 'index', index)
+        object.__setattr__(self, '_transform_update', transform_update)
+
+    def _changed(self, name):
+        self.storage.mark_changed()
+
+    def detach(self):
+        """Release the column and keep a private copy of the values."""
+        storage = self.storage
+        if isinstance(storage, TransformArray):
+            object.__setattr__(self, 'storage', _DetachedStorage(storage.data[:, self.index]))
+            storage.release(self.index)
+            object.__setattr__(self, 'index', 0)
+
+    def get_surface_size(self) -> (int, int):
+        return int(max(0, min(8192, self.width))), int(max(0, min(8192, self.height)))
+
+    @property
+    def x(self) -> float:
+        return self.storage.data[X, self.index].item()
+
+    @x.setter
+    def x(self, value: float):
+        self.storage.data[X, self.index] = value
+
+    @property
+    def y(self) -> float:
+        return self.storage.data[Y, self.index].item()
+
+    @y.setter
+    def y(self, value: float):
+        self.storage.data[Y, self.index] = value
+
+    @property
+    def width(self) -> float:
+        return self.storage.data[WIDTH, self.index].item()
+
+    @width.setter
+    def width(self, value: float):
+        self.storage.data[WIDTH, self.index] = value
+
+    @property
+    def height(self) -> float:
+        return self.storage.data[HEIGHT, self.index].item()
+
+    @height.setter
+    def height(self, value: float):
+        self.storage.data[HEIGHT, self.index] = value
+
+    @property
+    def _anchor_horizontal(self) -> float:
+        return self.storage.data[ANCHOR_HORIZONTAL, self.index].item()
+
+    @_anchor_horizontal.setter
+    def _anchor_horizontal(self, value: float):
+        self.storage.data[ANCHOR_HORIZONTAL, self.index] = value
+
+    @property
+    def _anchor_vertical(self) -> float:
+        return self.storage.data[ANCHOR_VERTICAL, self.index].item()
+
+    @_anchor_vertical.setter
+    def _anchor_vertical(self, value: float):
+        self.storage.data[ANCHOR_VERTICAL, self.index] = value
@@ -0,0 +1,78 @@
+"""Tiles of a ListLayout made only when they are used, for lists of many rows.
+
+  def make_row(index, tile):
+      # tile is a tile no longer in view to reuse, or None
+      tile = tile or RowTile()
+      tile.set_text(rows[index])
+      return tile
+  UniformListLayout(node_props, group, spacing=20, tiles=VirtualTiles(len(rows), make_row))
+
+ListLayout draws the tiles in view, so only those (and overscan tiles either
+side) are kept. A ListLayout without uniform spacing requires spacing(index)
+as well, so that tiles are not made to find their spacing.
+"""
+
+class VirtualTiles:
+    """A sequence of length tiles, where the tile at an index is made by
+    factory(index, recycled_tile) when it is first used. Tiles outside the
+    view set by ListLayout.draw are passed to the factory to be reused.
+    After the rows change, set length and call refresh(start_index), or
+    after removing a row, call pop(index)."""
+    def __init__(self, length: int, factory, overscan=8, spacing=None):
+        self.length = length
+        self.factory = factory
+        self.overscan = overscan
+        self.spacing = spacing
+        self.tiles = {}  # by index
+        self.recycled = []
+
+    def __len__(self) -> int:
+        return self.length
+
+    def __getitem__(self, index: int):
+        if index < 0:
+            index += self.length
+        if not 0 <= index < self.length:
+            raise IndexError(f'Tile index out of range: {index} (length {self.length})')
+        tile = self.tiles.get(index)
+        if tile is None:
+            recycled_tile = self.recycled.pop() if self.recycled else None
+            tile = self.tiles[index] = self.factory(index, recycled_tile)
+        return tile
+
+    def __iter__(self):
+        return (self[i] for i in range(self.length))
+
+    def set_view(self, indexes: range):
+        """Keeps the tiles of the indexes and overscan tiles either side,
+        so that the others can be reused."""
+        start, stop = indexes.start - self.overscan, indexes.stop + self.overscan
+        for index in [index for index in self.tiles if not start <= index < stop]:
+            self.recycled.append(self.tiles.pop(index))
+        del self.recycled[stop - start:]
+
+    def refresh(self, start_index=0):
+        """Makes the tiles from the start index again when next used."""
+        for index in [index for index in self.tiles if index >= start_index]:
+            self.recycled.append(self.tiles.pop(index))
+
+    def pop(self, index=-1):
+        """Removes the tile at the index after its row is removed, moving the
+        tiles after it back one index. Returns the tile, or None if not made."""
+        if index < 0:
+            index += self.length
+        if not 0 <= index < self.length:
+            raise IndexError(f'Tile index out of range: {index} (length {self.length})')
+        self.length -= 1
+        tile = self.tiles.pop(index, None)
+        for i in sorted(i for i in self.tiles if i > index):
+            self.tiles[i - 1] = self.tiles.pop(i)
+        return tile
+
+    def clear(self):
+        self.length = 0
+        self.refresh()
+
+    def materialized(self):
+        """The tiles that have been made, in order of index."""
+        return [self.tiles[index] for index in sorted(self.tiles)]
@@ -1,8 +1,11 @@
 import pygame
 import ast
+import inspect
+import weakref
 
 from engine import text as text
-from engine.node import Node, SpriteNode, NodeProps, Anchor
+from engine.node import Node, SpriteNode, NodeProps, Anchor, remove_subtrees
+from engine.mutations import Mutation
 from engine.interface import Style, Scrollbar, State, TextEntry, Toggle, Button
 import engine.template as template
 from engine.spritesheet import tint_surface
@@ -66,9 +69,16 @@ class InspectorLabel(SpriteNode):
 
 transform_types = ((('x', 'y'), (float, int)), (('width', 'height'), (int,)),
                    (('anchor_horizontal', 'anchor_vertical'), (float, int)))
+readable_types = int, str, tuple, bool, pygame.Rect
+_property_names = weakref.WeakKeyDictionary()  # by class, then by instance attribute names, as dir() is slow
+PROPERTY_NAMES_PER_CLASS = 32  # the sets of instance attribute names cached for each class
+
+PROPERTY_ROWS_Y = 210
+PROPERTY_ROW_HEIGHT = 14
 
 class InspectorTab(SpriteNode):
     _layer = 0
+    mutation_limit = 1024  # with more changes between updates (such as while disabled), all rows are listed
 
     def __init__(self, node_props, group, ui_style, **kwargs):
         super().__init__(node_props, group)
@@ -92,6 +102,13 @@ class InspectorTab(SpriteNode):
         self.selected_node = None
         self.user_scene = None
         self.toggle_enabled = None
+        self.widgets = {}  # by name, reused by the next selection
+        self.placed_widgets = []  # names of the widgets used by the selection
+        self.property_rows = []  # names of the read-only attributes listed
+        self.property_texts = []  # the repr of each value when drawn, or None
+        self.changed_rows = set()
+        self.attribute_count = 0  # of the instance attributes when the rows were listed
+        self.mutations = None  # subscription to the mutations of the user scene, while a node is selected
         self.widget_holder = Node(NodeProps(self, 5, 0))
         self.set_selected(self.parent.selected_node, self.parent.user_scene)
 
@@ -102,18 +119,59 @@ class InspectorTab(SpriteNode):
 
     def set_selected(self, node, user_scene):
         # Set the selected node and user scene to match the parent editor
+        self.subscribe(user_scene if node is not None else None)
         self.selected_node = node
         self.user_scene = user_scene
-        # Delete all previous widgets and clear references to them
-        for i in range(len(self.widget_holder.nodes)):
-            self.widget_holder.nodes[0].remove()
-        self.widget_holder.nodes.clear()
         self.toggle_enabled = None
+        self.placed_widgets = []
+        self.property_rows = []
+        self.property_texts = []
+        self.changed_rows.clear()
         # Show either the scene or node inspector based on the selection
         if self.selected_node is None:
             self.generate_scene_inspector()
         else:
             self.generate_node_inspector()
+        # Delete the previous widgets not reused
+        unused_widgets = [self.widgets.pop(name) for name in list(self.widgets)
+                          if name not in self.placed_widgets]
+        if unused_widgets:
+            remove_subtrees(unused_widgets)
+
+    def subscribe(self, user_scene):
+        """Subscribe to the mutations of the user scene instead of the previous
+        user scene, or to none if None."""
+        if self.mutations is not None:
+            self.user_scene.mutations.unsubscribe(self.mutations)
+            self.mutations = None
+        if hasattr(user_scene, 'mutations'):
+            self.mutations = user_scene.mutations.subscribe(self.mutation_limit)
+
+    def remove(self):
+        self.subscribe(None)
+        super().remove()
+
+    def place_widget(self, name, rect, create, default_text=''):
+        """Return the widget of the name from the previous selection, moved to the
+        rect and reset, or a new widget made by create(node_props) if there is none.
+        The widgets are kept in the order placed."""
+        widget = self.widgets.get(name)
+        if widget is None:
+            widget = self.widgets[name] = create(NodeProps(self.widget_holder, *rect))
+        else:
+            widget.transform.set(*rect)
+            # Not hovered, pressed or being edited, so no longer capturing the mouse
+            widget.state = State.idle
+            if hasattr(self._scene, 'mouse_captured'):
+                self._scene.mouse_captured.discard(widget)
+            if isinstance(widget, TextEntry):
+                widget.text = default_text
+            widget.dirty = 1
+        index = len(self.placed_widgets)
+        if self.widget_holder.nodes[index] is not widget:
+            widget.reorder(index)
+        self.placed_widgets.append(name)
+        return widget
 
     def generate_scene_inspector(self):
         self.label_top.enabled = False
@@ -124,9 +182,9 @@ class InspectorTab(SpriteNode):
         self.scroll_limits = 0, 0
         question_icon = self.parent.icon_sheet.load_image(pygame.Rect(3, 0, 1, 1), 8)
         tint_surface(question_icon, self.style.get('color_scroll'))
-        Button(NodeProps(
-            self.widget_holder, 127, 54, 16, 16), self.group, image=question_icon,
-            callback=lambda: self.parent.action_show_help('Groups'), style=self.ui_style)
+        self.place_widget('help_groups', (127, 54, 16, 16), lambda node_props: Button(
+            node_props, self.group, image=question_icon,
+            callback=lambda: self.parent.action_show_help('Groups'), style=self.ui_style))
 
     def half_widget_columns(self):
         """Return x values for left, right columns."""
@@ -152,36 +210,54 @@ class InspectorTab(SpriteNode):
             current_y += 18
             for attribute_pair, allow_types in transform_types:
                 for column in (0, 1):
-                    LiteralEntry(NodeProps(
-                        self.widget_holder, half_widget_columns[column], current_y, half_widget_width, 15),
-                        self.group, '', attribute_pair[column], self.set_transform_attribute,
-                        allow_characters=LiteralEntry.NUMERIC, allow_types=allow_types,
-                        style=self.entry_style)
+                    self.place_widget(attribute_pair[column], (
+                        half_widget_columns[column], current_y, half_widget_width, 15),
+                        lambda node_props: LiteralEntry(
+                            node_props, self.group, '', attribute_pair[column], self.set_transform_attribute,
+                            allow_characters=LiteralEntry.NUMERIC, allow_types=allow_types,
+                            style=self.entry_style))
                 current_y += 18
             current_y += 8
 
         enabled = getattr(self.selected_node, 'enabled', None)
         if enabled is not None:
-            self.toggle_enabled = Toggle(NodeProps(
-                self.widget_holder, full_widget_column, current_y, half_widget_width, 15), self.group,
-                str(enabled), self.set_enabled_attribute, enabled, style=self.ui_style)
+            self.toggle_enabled = self.place_widget('enabled', (
+                full_widget_column, current_y, half_widget_width, 15), lambda node_props: Toggle(
+                node_props, self.group, str(enabled), self.set_enabled_attribute, enabled, style=self.ui_style))
             self.toggle_enabled.bound = 'enabled'
+            self.toggle_enabled.checked = enabled
+            self.toggle_enabled.message = str(enabled)
             current_y += 20
 
         if isinstance(self.selected_node, pygame.sprite.DirtySprite):
-            LiteralEntry(NodeProps(
-                self.widget_holder, full_widget_column, current_y, half_widget_width, 15),
-                self.group, '', '_layer', self.set_layer, allow_types=(int,),
-                allow_characters=LiteralEntry.NUMERIC, style=self.entry_style)
+            self.place_widget('_layer', (full_widget_column, current_y, half_widget_width, 15),
+                              lambda node_props: LiteralEntry(
+                                  node_props, self.group, '', '_layer', self.set_layer, allow_types=(int,),
+                                  allow_characters=LiteralEntry.NUMERIC, style=self.entry_style))
             current_y += 20
             indexes = list(template.group_indexes(self.user_scene, self.selected_node))
-            LiteralEntry(NodeProps(
-                self.widget_holder, full_widget_column, current_y, half_widget_width, 15),
-                self.group, str(indexes)[1:-1], 'groups', self.set_groups, allow_types=(list, tuple),
-                allow_characters='1234567890 [],', style=self.entry_style)
-
-        self.scroll_limits = 0, max(0, 216 + sum(1 for _ in self.readable_properties(self.selected_node)) * 14 - self.transform.height)
-        self.scrollbar.scroll_by(0)
+            self.place_widget('groups', (full_widget_column, current_y, half_widget_width, 15),
+                              lambda node_props: LiteralEntry(
+                                  node_props, self.group, str(indexes)[1:-1], 'groups', self.set_groups,
+                                  allow_types=(list, tuple), allow_characters='1234567890 [],',
+                                  style=self.entry_style),
+                              default_text=str(indexes)[1:-1])
+
+        self.update_property_rows()
+
+    def update_property_rows(self):
+        """List the read-only attributes of the selected node that have values
+        of readable types. If the rows change, the inspector is drawn again."""
+        self.attribute_count = len(getattr(self.selected_node, '__dict__', ()))
+        property_rows = list(self.readable_properties(self.selected_node))
+        if property_rows != self.property_rows:
+            self.property_rows = property_rows
+            self.property_texts = [None] * len(property_rows)
+            self.changed_rows.clear()
+            self.scroll_limits = 0, max(0, PROPERTY_ROWS_Y + 6 + len(property_rows) * PROPERTY_ROW_HEIGHT
+                                        - self.transform.height)
+            self.scrollbar.scroll_by(0)
+            self.dirty = 1
 
     def resize_node_inspector(self):
         self.label_top.transform.width = self.transform.width
@@ -221,6 +297,60 @@ class InspectorTab(SpriteNode):
                 self.toggle_enabled.checked = self.selected_node.enabled
                 self.toggle_enabled.dirty = 1
 
+        # The attributes are listed again after the node changes in the scene or
+        # gains or loses attributes, or when a row in view is no longer readable.
+        # Moving or resizing the node only changes the values of rows, found below
+        node = self.selected_node
+        mutations = self.mutations.drain() if self.mutations is not None else None
+        if (mutations is None or len(getattr(node, '__dict__', ())) != self.attribute_count
+                or any(mutated is node and kind != Mutation.transform for kind, mutated in mutations)):
+            self.update_property_rows()
+        if self.dirty == 0:  # otherwise every row in view is drawn
+            for i in self.property_rows_in_view():
+                value = getattr(node, self.property_rows[i], None)
+                if type(value) not in readable_types:
+                    self.update_property_rows()
+                    break
+                if repr(value) != self.property_texts[i]:
+                    self.changed_rows.add(i)
+
+    def property_rows_in_view(self) -> range:
+        start = (self.scroll_pixels - PROPERTY_ROWS_Y) // PROPERTY_ROW_HEIGHT
+        stop = (self.scroll_pixels + self.transform.height - PROPERTY_ROWS_Y) // PROPERTY_ROW_HEIGHT + 1
+        return range(max(0, start), max(0, min(stop, len(self.property_rows))))
+
+    def property_text(self, index: int) -> str:
+        return repr(getattr(self.selected_node, self.property_rows[index], None))
+
+    def property_row_rect(self, index: int) -> pygame.Rect:
+        y = PROPERTY_ROWS_Y + index * PROPERTY_ROW_HEIGHT - self.scroll_pixels
+        return pygame.Rect(0, y, self.transform.width, PROPERTY_ROW_HEIGHT).clip(self.image.get_rect())
+
+    def draw_property_row(self, index: int):
+        """Draws the name and value of the read-only attribute at the index,
+        and records the value drawn."""
+        prop, value_text = self.property_rows[index], self.property_text(index)
+        y = PROPERTY_ROWS_Y + index * PROPERTY_ROW_HEIGHT - self.scroll_pixels
+        text.draw(self.image, prop, (5, y), color=self.style.get('color'))
+        text.draw(self.image, value_text, (135, y))
+        self.property_texts[index] = value_text
+
+    def draw_changed_rows(self):
+        """Draws only the rows whose values changed, updating their areas of the screen."""
+        rows_in_view = self.property_rows_in_view()
+        for i in self.changed_rows:
+            area = self.property_row_rect(i)
+            if i not in rows_in_view or not area:
+                continue
+            # Text may overlap adjacent rows, so those are drawn again within the area
+            self.image.set_clip(area)
+            self.image.fill(self.style.get('background'))
+            for index in range(max(0, i - 1), min(i + 2, len(self.property_rows))):
+                self.draw_property_row(index)
+            self.image.set_clip(None)
+            self.add_dirty_rect(area)
+        self.changed_rows.clear()
+
     def set_enabled_attribute(self, set_enable):
         self.selected_node.enabled = set_enable
         self.toggle_enabled.message = str(set_enable)
@@ -270,11 +400,12 @@ class InspectorTab(SpriteNode):
                     text.draw(self.image, str(group), (25, 80 + i * 14), color=self.style.get('color_scroll'))
             else:
                 self.draw_node_inspector()
-                for i, prop in enumerate(self.readable_properties(self.selected_node)):
-                    text.draw(self.image, prop, (5, 210 + i * 14 - self.scroll_pixels),
-                              color=self.style.get('color'))
-                    text.draw(self.image, repr(getattr(self.selected_node, prop)),
-                              (135, 210 + i * 14 - self.scroll_pixels))
+                self.property_texts = [None] * len(self.property_rows)
+                for i in self.property_rows_in_view():
+                    self.draw_property_row(i)
+            self.changed_rows.clear()
+        elif self._visible and self.changed_rows:
+            self.draw_changed_rows()
 
     def draw_node_inspector(self):
         _widgets = (widget for widget in self.widget_holder.nodes)
@@ -305,7 +436,7 @@ class InspectorTab(SpriteNode):
             self.scroll_text('List type. Refer to the scene groups table.', (5, widget_y + 36),
                              font=self.describe_font, static=True)
 
-        self.scroll_text('The following attributes cannot be edited. Values since selected.',
+        self.scroll_text('The following attributes cannot be edited.',
                          (5, 195), font=self.describe_font, static=True)
 
     def scroll_text(self, message, position, color=text.COLOR_DEFAULT, **kwargs):
@@ -318,9 +449,26 @@ class InspectorTab(SpriteNode):
             self.resize_node_inspector()
         self.scrollbar.scroll_by(0)
 
+    @staticmethod
+    def property_names(node) -> tuple:
+        """The public attribute names of the node, excluding methods, cached
+        for each class and set of instance attributes."""
+        instance_names = tuple(getattr(node, '__dict__', ()))
+        class_names = _property_names.get(type(node))
+        if class_names is None:
+            class_names = _property_names[type(node)] = {}
+        names = class_names.get(instance_names)
+        if names is None:
+            if len(class_names) >= PROPERTY_NAMES_PER_CLASS:
+                class_names.clear()
+            names = class_names[instance_names] = tuple(
+                prop for prop in dir(node)
+                if not (prop.startswith('_') or prop in ('enabled', 'layer', 'blendmode')
+                        or (prop not in instance_names and inspect.isroutine(getattr(type(node), prop, None)))))
+        return names
+
     @staticmethod
     def readable_properties(node):
-        for prop in dir(node):
-            if (not (prop.startswith('_') or prop in ('enabled', 'layer', 'blendmode')) and
-                    type(getattr(node, prop)) in (int, str, tuple, bool, pygame.Rect)):
+        for prop in InspectorTab.property_names(node):
+            if type(getattr(node, prop)) in readable_types:
                 yield prop
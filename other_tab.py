@@ -1,4 +1,6 @@
 import pygame
+import os
+from bisect import bisect_left, bisect_right
 
 import engine.text as text
 from engine.node import Node, SpriteNode, NodeProps, Anchor
@@ -37,6 +39,35 @@ class TabHeading(SpriteNode):
                      width=width, font=style_get('font'), color=style_get('color'),
                      box_color=brighten_color(style_get('background'), -4))
 
+class HelpDocument:
+    """The lines of a help text file, indexed into pages from each '# heading'
+    to the next heading. Shared by path and read again if the file changes."""
+    _documents = {}
+
+    def __init__(self, lines: list, modified_time: int):
+        self.lines = lines
+        self.modified_time = modified_time
+        self.pages = {}  # line range of each page by heading (the last if repeated)
+        starts = [i for i, line in enumerate(lines) if line.startswith('#')]
+        for start, end in zip(starts, starts[1:] + [len(lines)]):
+            self.pages[lines[start].lstrip('#').lstrip(' ')] = start, end
+
+    @classmethod
+    def load(cls, path: str):
+        """The document of the file at the path. Raises OSError if the file cannot be read."""
+        modified_time = os.stat(path).st_mtime_ns
+        document = cls._documents.get(path, None)
+        if document is None or document.modified_time != modified_time:
+            with open(path, 'r') as f:
+                lines = [line.rstrip('\n') for line in f.readlines()]
+            document = cls._documents[path] = cls(lines, modified_time)
+        return document
+
+    def page(self, heading: str) -> list:
+        """The lines from the heading until the next heading (empty if not found)."""
+        start, end = self.pages.get(heading, (0, 0))
+        return self.lines[start:end]
+
 class HelpTab(SpriteNode):
     _layer = 0
     TEXT_PATH = 'Assets/docs.md'
@@ -57,7 +88,11 @@ class HelpTab(SpriteNode):
         self.scroll_pixels = 0
         self.scroll_limits = 0, 0
         self._closed_page_scroll = {}
-        self._text_surfaces = {}
+        # The y position of each wrapped line in increasing order, and its (line, font, color)
+        self._line_offsets = []
+        self._line_keys = []
+        self._line_surfaces = {}  # rendered lines by (line, font, color), only while visible
+        self._wrap_width = None
 
         button_hide_help = Button(NodeProps(self, 95, -20, 50, 20), group, 'Close',
                                   self.parent.action_hide_help, style=self.style, background=(76, 36, 36))
@@ -74,14 +109,36 @@ class HelpTab(SpriteNode):
         super().draw()
         if self._visible and self.dirty > 0:
             self.image.fill(self.style.get('background'))
-            for absolute_y, text_image in self._text_surfaces.items():
-                scrolled_y = absolute_y - self.scroll_pixels
-                if -20 < scrolled_y < self.transform.height:
-                    self.image.blit(text_image, (5, scrolled_y))
+            # Find the lines in view, render any not already rendered,
+            # and release the surfaces of lines scrolled out of view
+            start = bisect_right(self._line_offsets, self.scroll_pixels - 20)
+            end = bisect_left(self._line_offsets, self.scroll_pixels + self.transform.height, start)
+            previous_surfaces, self._line_surfaces = self._line_surfaces, {}
+            for absolute_y, key in zip(self._line_offsets[start:end], self._line_keys[start:end]):
+                text_image = self._line_surfaces.get(key, None) or previous_surfaces.get(key, None)
+                if text_image is None:
+                    text_image = text.render(*key, save_sprite=False)
+                self._line_surfaces[key] = text_image
+                self.image.blit(text_image, (5, absolute_y - self.scroll_pixels))
+
+    def on_resize(self):
+        super().on_resize()
+        # Wrap the text again if the width of lines has changed
+        if self.lines and self._wrap_width != self.wrap_width():
+            current_y = self.draw_help_text()
+            self.scroll_limits = 0, max(0, current_y - self.transform.height)
+            self.scrollbar.scroll_by(0)
+
+    def wrap_width(self) -> int:
+        return max(100, min(450, self.transform.width - 8))
 
     def draw_help_text(self):
-        self._text_surfaces.clear()
-        # Iterate through lines and render the text
+        """Wrap the lines of the page and position each wrapped line.
+        Lines are only rendered when drawn in view."""
+        self._line_offsets.clear()
+        self._line_keys.clear()
+        self._wrap_width = self.wrap_width()
+        # Iterate through lines and position the text
         current_y = 4
         color = self.style.get('color')
         for line in self.lines:
@@ -101,19 +158,12 @@ class HelpTab(SpriteNode):
         self._closed_page_scroll[self.seek_to_page] = self.scroll_pixels
         self.seek_to_page = page
         try:
-            with open(self.TEXT_PATH, 'r') as f:
-                all_lines = [line.rstrip('\n') for line in f.readlines()]
+            document = HelpDocument.load(self.TEXT_PATH)
         except OSError:
             print('Engine warning: Text help file could not be opened.')
             return
         # Copy the lines from the target '# heading' until the next
-        start = end = 0
-        for i, line in enumerate(all_lines):
-            if line.lstrip('#').lstrip(' ') == self.seek_to_page:
-                start = i
-            if end <= start and line.startswith('#'):
-                end = i
-        self.lines = all_lines[start:end]
+        self.lines = document.page(self.seek_to_page)
         self.dirty = 1
         current_y = self.draw_help_text()
         self.scroll_limits = 0, max(0, current_y - self.transform.height)
@@ -121,21 +171,11 @@ class HelpTab(SpriteNode):
 
     def scroll_wrap(self, message, current_y, color=text.COLOR_DEFAULT,
                     font=text.FONT_DEFAULT):
-        """Applies text wrapping to message then renders and caches each surface."""
-        words = message.split()
-        lines = ['']
-        line_number = 0  # current index into lines
-        max_width = max(100, min(450, self.transform.width - 8))
-        # Split the message into lines, wrapping when width does not fit
-        for word in words:
-            if font.size(lines[line_number] + word)[0] > max_width:
-                lines.append(word + ' ')  # begin a new line with the word
-                line_number += 1
-            else:
-                lines[line_number] += word + ' '
+        """Applies text wrapping to message then adds each line at its y position."""
         font_height = font.size('A')[1]
-        for line in lines:
-            self._text_surfaces[current_y] = text.render(line, font, color, save_sprite=False)
+        for line in text.wrap(message, self._wrap_width or self.wrap_width(), font):
+            self._line_offsets.append(current_y)
+            self._line_keys.append((line, font, tuple(color)))
             current_y += font_height + 1
         return current_y + 1
 
@@ -154,12 +194,11 @@ class SceneTab(Node):
         target = self.parent.selected_node
         if target is not None and hasattr(target, 'rect') and getattr(target.parent, 'is_origin', 'Scene') == 'Scene':
             if target.rect.width > 0 and target.rect.height > 0:
-                self.box.transform.position = target.rect.x - 1, target.rect.y - 1
-                self.box.transform.size = target.rect.width + 2, target.rect.height + 2
+                self.box.transform.set(target.rect.x - 1, target.rect.y - 1,
+                                       target.rect.width + 2, target.rect.height + 2)
                 self.box.is_point = False
             else:
-                self.box.transform.position = target.rect.x - 4, target.rect.y - 4
-                self.box.transform.size = 9, 9
+                self.box.transform.set(target.rect.x - 4, target.rect.y - 4, 9, 9)
                 self.box.is_point = True
             self.box.enabled = True
         else:
@@ -6,6 +6,7 @@ import pygame as pg
 import sys
 from importlib import import_module
 import editor_scenes
+from engine.events import EventDispatcher
 from constants import *
 
 LAST_PROJECT_PATH = None
@@ -32,6 +33,8 @@ def main():
         user_scenes = editor_scenes.Select.set_project(LAST_PROJECT_PATH)
         scene = editor_scenes.Editor(screen, clock, user_scenes, LAST_PROJECT_PATH)
 
+    # Leave at least half of each frame for updating and drawing
+    dispatcher = EventDispatcher(time_budget=500 / FPS)
     running = True
 
     while running:
@@ -43,8 +46,7 @@ def main():
         if pg.event.get(pg.QUIT):
             running = False
         else:
-            events = pg.event.get()
-            scene.handle_events(events)
+            dispatcher.dispatch(scene, pg.event.get())
 
         # Update scene and display --
         scene.update()
@@ -0,0 +1,146 @@
+"""Tests the editor class TreeTabGrid, updating from the mutations of a scene."""
+
+import os
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+import pygame
+from engine.node import Node, NodeProps
+from engine.scene import Scene
+from engine.spritesheet import TileSpriteSheet
+from tree_tab import TreeTabGrid
+
+ICON_SHEET_PATH = os.path.join(os.path.dirname(__file__), '..', 'Assets', 'EditorIcons.png')
+
+def pre_order(tree, collapsed, depth=0):
+    """The (node, depth) of each node shown in a tree view."""
+    order = []
+    for node in tree.nodes:
+        order.append((node, depth))
+        if node not in collapsed:
+            order.extend(pre_order(node, collapsed, depth + 1))
+    return order
+
+def linearized(grid):
+    assert all(entry.index == index for index, entry in enumerate(grid.linear_copy))
+    assert len(grid.entries) == len(grid.linear_copy)
+    return [(entry.weak_reference(), entry.depth) for entry in grid.linear_copy]
+
+def test_tree_tab_grid_mutations():
+    if not pygame.display.get_surface():
+        pygame.display.set_mode((1, 1))
+    ui_scene = Scene(pygame.Surface((300, 300)), None)
+    ui_scene.create_draw_group((0, 0, 0))
+    tree = Scene(pygame.Surface((10, 10)), None)
+    for i in range(40):
+        node = Node(NodeProps(tree))
+        for j in range(2):
+            Node(NodeProps(node))
+    grid = TreeTabGrid(NodeProps(ui_scene, 0, 0, 200, 100), ui_scene.group_draw, tree,
+                       TileSpriteSheet(ICON_SHEET_PATH), color=(200, 200, 200), background=(20, 20, 20))
+    while ui_scene.draw():  # the first frames update the whole screen
+        pass
+    assert linearized(grid) == pre_order(tree, grid.collapsed)
+
+    traversed = []
+    traverse_nodes = grid.traverse_nodes
+
+    def counting_traverse_nodes(nodes, *args):
+        nodes = list(nodes)
+        traversed.extend(nodes)
+        traverse_nodes(nodes, *args)
+    grid.traverse_nodes = counting_traverse_nodes
+
+    print('Test: Appending a node out of view only adds its entry, without drawing.')
+    entries = list(grid.linear_copy)
+    appended = Node(NodeProps(tree.nodes[-1]))
+    grid.update()
+    assert traversed == [appended]
+    assert grid.linear_copy[:-1] == entries
+    assert linearized(grid) == pre_order(tree, grid.collapsed)
+    assert grid.dirty == 0 and not grid._redraw_tiles
+
+    print('Test: Removing a node in view redraws only the tiles after it.')
+    tree.nodes[0].nodes[1].remove()
+    grid.update()
+    assert traversed == [appended]
+    assert linearized(grid) == pre_order(tree, grid.collapsed)
+    assert grid.dirty == 0 and grid._redraw_tiles == set(range(2, 6))
+    ui_scene.draw()
+
+    print('Test: Moved nodes keep their entries, at their new depth.')
+    moved = tree.nodes[3]
+    index = grid.entries[id(moved)].index
+    moved_entries = grid.linear_copy[index:index + 3]
+    moved.reparent(tree.nodes[30], 1)
+    grid.update()
+    assert linearized(grid) == pre_order(tree, grid.collapsed)
+    assert grid.entries[id(moved)] is moved_entries[0] and moved_entries[0].depth == 1
+    assert [entry.depth for entry in moved_entries] == [1, 2, 2]
+
+    print('Test: Nodes added to or moved out of a collapsed node are shown when expanded.')
+    grid.toggle_collapsed(grid.entries[id(tree.nodes[5])])
+    Node(NodeProps(tree.nodes[5]))
+    tree.nodes[5].nodes[0].reparent(tree)
+    grid.update()
+    assert linearized(grid) == pre_order(tree, grid.collapsed)
+    grid.toggle_collapsed(grid.entries[id(tree.nodes[5])])
+    assert linearized(grid) == pre_order(tree, grid.collapsed)
+
+    print('Test: Entries of nodes that lose their last child node are not expandable.')
+    tree.nodes[1].clear_children()
+    grid.update()
+    assert grid.entries[id(tree.nodes[1])].expanded is None
+    assert linearized(grid) == pre_order(tree, grid.collapsed)
+
+    print('Test: Entries are renumbered once per update, with sibling positions from the mutations.')
+    class CountingList(list):
+        index_calls = 0
+
+        def index(self, *args):
+            CountingList.index_calls += 1
+            return super().index(*args)
+
+    tree.nodes = CountingList(tree.nodes)
+    renumbered = []
+    renumber_entries = grid.renumber_entries
+
+    def counting_renumber_entries(start_index):
+        renumbered.append(start_index)
+        renumber_entries(start_index)
+    grid.renumber_entries = counting_renumber_entries
+
+    first = Node(NodeProps(tree))
+    first.reorder(0)
+    Node(NodeProps(first))
+    tree.nodes[4].remove()
+    Node(NodeProps(tree)).reorder(2)
+    Node(NodeProps(tree))
+    grid.update()
+    assert renumbered == [0] and CountingList.index_calls == 0
+    assert linearized(grid) == pre_order(tree, grid.collapsed)
+
+    print('Test: After more changes than the limit, the tree is traversed.')
+    grid.mutation_limit = 4
+    grid.subscribe(tree)
+    for i in range(5):
+        Node(NodeProps(tree.nodes[i]))
+    assert grid.mutations.overflowed
+    grid.update()
+    assert linearized(grid) == pre_order(tree, grid.collapsed)
+
+    print('Test: Removed grids unsubscribe from the mutations of the tree.')
+    subscriptions = len(tree.mutations.subscriptions)
+    other_grid = TreeTabGrid(NodeProps(ui_scene, 0, 0, 200, 100), ui_scene.group_draw, tree,
+                             TileSpriteSheet(ICON_SHEET_PATH))
+    assert len(tree.mutations.subscriptions) == subscriptions + 1
+    other_grid.remove()
+    assert len(tree.mutations.subscriptions) == subscriptions
+
+    ui_scene.draw()
+    drawn = pygame.image.tobytes(grid.image, 'RGB')
+    grid.dirty = 1
+    ui_scene.draw()
+    assert drawn == pygame.image.tobytes(grid.image, 'RGB')
+
+
+if __name__ == '__main__':
+    test_tree_tab_grid_mutations()
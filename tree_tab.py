@@ -2,6 +2,7 @@ import pygame
 import engine.text as text
 from engine.spritesheet import tint_surface
 from engine.node import SpriteNode, NodeProps, Anchor
+from engine.mutations import Mutation
 import engine.interface as interface
 from engine.template import NODE_CLASSES, INTERFACE_CLASSES, node_to_template
 
@@ -10,19 +11,37 @@ import weakref
 
 
 class LinearEntry:
-    __slots__ = 'weak_reference', 'reference_visible', 'reference_enabled', 'image', 'depth'
+    __slots__ = ('weak_reference', 'node_id', 'reference_visible', 'reference_enabled', 'expanded', 'image',
+                 'depth', 'index', 'shifts', 'marker_range')
 
-    def __init__(self, reference_node, image_size, depth):
+    def __init__(self, reference_node, depth, expanded=None):
         self.weak_reference = weakref.ref(reference_node)
+        self.node_id = id(reference_node)  # the key in TreeTabGrid.entries
         self.reference_visible = getattr(reference_node, 'visible', -1)
         self.reference_enabled = getattr(reference_node, 'enabled', -1)
-        self.image = pygame.Surface(image_size)
+        self.expanded = expanded  # None without child nodes, False if collapsed
+        self.image = None  # a surface from the pool of the grid, while near the view
         self.depth = depth
+        self.index = -1  # in the linear copy, or -1 if cut out of it
+        self.shifts = 0  # the splices of the grid already counted in the index (see entry_index)
+        self.marker_range = None  # the x range of the [+]/[-] marker, when drawn
 
 class TreeTabGrid(interface.UniformListLayout):
     """This tab visualises the tree of nodes for the user scene.
-    It maintains a linearised version of the tree as self.linear_copy."""
+    It maintains a linearised version of the tree as self.linear_copy, updated
+    from the mutations of the scene once per frame: the entries of added,
+    removed or moved nodes (and their child nodes) are spliced in or cut out,
+    and the entries of enabled or shown nodes are redrawn. The entry of each
+    node in it is found by id(node) in self.entries. The child nodes of
+    collapsed nodes are left out.
+    While splicing, the indexes of the entries after each splice are
+    corrected by entry_index() and only renumbered once afterwards.
+    Entries are only drawn when in view (or within overscan entries of it),
+    using surfaces reused from self.surface_pool."""
     event_handler = interface.MOUSE_EVENTS
+    overscan = 8
+    splice_limit = 32  # with more nodes added, removed or moved, the tree is traversed instead
+    mutation_limit = 1024  # with more changes between updates (such as while disabled), likewise
 
     def __init__(self, node_props, group, tree, icon_sheet, **kwargs):
         super().__init__(node_props, group, **kwargs)
@@ -37,80 +56,310 @@ class TreeTabGrid(interface.UniformListLayout):
         self.selected_entry = None
         self.hovered_entry = None
         self.tree = tree
+        self.mutations = None  # subscription to the mutations of the tree
+        self.subscribe(tree)
+        self.entries = {}
+        self.collapsed = weakref.WeakSet()  # nodes whose child nodes are hidden
+        self.drawn_entries = []  # entries with an image
+        self.splices = []  # the (index, change in length) of each splice not yet renumbered
+        self.surface_pool = []
         self.linear_copy = self.tiles  # alias
-        self.get_linear_copy(self.tree)
+        self.update_linear_copy()
         self.use_image = True
 
         text_surf = text.render('generated ', color=(255, 255, 255), save_sprite=False)
         self.g_text_offset = text_surf.get_width()
 
-    def get_linear_copy(self, tree, depth=0):
-        for node in tree.nodes:
-            self.linear_copy.append(self.new_entry(node, depth))
-            self.get_linear_copy(node, depth + 1)
+    def new_entry(self, reference_node, depth, expanded=None):
+        return LinearEntry(reference_node, depth, expanded)
 
-    def new_entry(self, reference_node, depth):
-        entry = LinearEntry(reference_node, self.forward_to_rect(0).size, depth)
-        self.entry_redraw(entry)
-        return entry
+    def get_tile_image(self, entry):
+        if entry.image is None:
+            if self.surface_pool:
+                entry.image = self.surface_pool.pop()
+            else:
+                entry.image = pygame.Surface(self.forward_to_rect(0).size)
+            self.entry_redraw(entry)
+            self.drawn_entries.append(entry)
+        return entry.image
+
+    def release_entry_images(self):
+        """Returns the surfaces of entries out of view (and overscan)
+        or no longer in the linear copy to the pool."""
+        indexes = self.indexes_in_view()
+        start, stop = indexes.start - self.overscan, indexes.stop + self.overscan
+        drawn_entries = []
+        for entry in self.drawn_entries:
+            if (max(start, 0) <= entry.index < min(stop, len(self.linear_copy))
+                    and self.linear_copy[entry.index] is entry):
+                drawn_entries.append(entry)
+            else:
+                self.surface_pool.append(entry.image)
+                entry.image = None
+        self.drawn_entries = drawn_entries
+        del self.surface_pool[stop - start:]
 
-    def update(self):
-        node_count = self.traverse_tree(self.tree)
-        # Remove deleted nodes at the end of the tree
-        if node_count < len(self.linear_copy):
-            # print('del remainder', node_count, len(self.linear_copy))
-            del self.linear_copy[node_count:]
-            self.dirty = 1
+    def draw(self):
+        if self._visible and (self.dirty > 0 or self._redraw_tiles):
+            self.release_entry_images()
+        super().draw()
 
-    def traverse_tree(self, tree, index_list=0, depth=0) -> int:
-        """Perform a pre-order traversal of the tree and update the linear copy
-        to match the tree, by detecting which nodes have been added or removed.
-        Entries at the end of the linear copy are never removed, so to clear
-        these, del list[i:] using the return value i (number of real entries).
-        """
-        for node in tree.nodes:
-            self.find_node_in_list(node, index_list, depth)
-            index_list += 1
-            if node.nodes:  # checking it is not a leaf node is an optimisation
-                index_list = self.traverse_tree(node, index_list, depth + 1)
-        return index_list
-
-    def find_node_in_list(self, node, index_list, depth):
-        """Check for the given node in the linear copy, at or following the
-        index, and update the linear copy to match the tree at that index."""
-        start_index = index_list
-        len_list = len(self.linear_copy)
-
-        # Loop until the node is found or the end of the list is reached
-        found_node = False
-        while not found_node and index_list < len_list:
-            copy_node = self.linear_copy[index_list]
-            if node is copy_node.weak_reference():
-                node_visible = getattr(node, 'visible', -1)
-                node_enabled = getattr(node, 'enabled', - 1)
-                # If the entry corresponding to a node is found, ensure that
-                # its properties still match - redraw it if they have changed
-                if (node_enabled != copy_node.reference_enabled
-                        or node_visible != copy_node.reference_visible):
-                    copy_node.reference_enabled = node_enabled
-                    copy_node.reference_visible = node_visible
-                    self.entry_redraw(copy_node)
-                found_node = True  # exit loop
-            else:
-                index_list += 1
+    def subscribe(self, tree):
+        """Subscribe to the mutations of the tree instead of the previous tree.
+        Trees without mutations are traversed every frame."""
+        if self.mutations is not None:
+            self.tree.mutations.unsubscribe(self.mutations)
+            self.mutations = None
+        if hasattr(tree, 'mutations'):
+            self.mutations = tree.mutations.subscribe(self.mutation_limit)
 
-        # Node not found in list, so it must be new, so insert it into list
-        if index_list >= len_list:
-            # print('create', start_index, depth)  # assert not found_node
-            self.linear_copy.insert(start_index, self.new_entry(node, depth))
+    def remove(self):
+        self.subscribe(None)
+        super().remove()
 
-        # Did we skip over any nodes in list? Delete those as they are no longer in tree
-        elif index_list - start_index > 0:
-            # print('del from tree', start_index, index_list)
-            del self.linear_copy[start_index:index_list]
+    def update(self):
+        mutations = self.mutations.drain() if self.mutations is not None else None
+        if mutations is None:
+            self.update_linear_copy()
+            return
+        if not mutations:
+            return
+        moved = [(kind, node) for kind, node in mutations
+                 if kind in (Mutation.added, Mutation.removed, Mutation.reordered)]
+        if len(moved) > self.splice_limit:
+            self.update_linear_copy()
+        elif moved:
+            self.splice_linear_copy(moved)
+        for kind, node in mutations:
+            if kind == Mutation.enabled:
+                self.node_changed(node)
+
+    def update_linear_copy(self):
+        """Match the linear copy to a pre-order traversal of the tree, reusing
+        the entries of nodes already in it. Redraws the changed entries, or
+        the whole list if entries were added, removed or moved."""
+        linear_copy, entries, changed_indexes = [], {}, []
+        self.traverse_nodes(self.tree.nodes, linear_copy, entries, changed_indexes)
+        self.entries = entries
+        if linear_copy != self.linear_copy:
+            self.linear_copy[:] = linear_copy
             self.dirty = 1
+        else:
+            for index in changed_indexes:
+                self.redraw_tile(index)
+
+    def splice_linear_copy(self, mutations):
+        """Cut the entries of removed and moved nodes (with their child nodes)
+        out of the linear copy, then splice in the entries of added and moved
+        nodes, given their (kind, node) mutations. The entries after the first
+        index changed are renumbered once, and only the tiles in view after
+        it are redrawn."""
+        linear_copy = self.linear_copy
+        old_length = start = len(linear_copy)
+        cut_entries, parents = [], []
+        for kind, node in mutations:
+            if kind == Mutation.removed:
+                parents.append(node.parent)
+            elif kind == Mutation.added:
+                continue
+            entry = self.linearized_entry(node)
+            if entry is None:
+                if kind == Mutation.reordered:
+                    parents.extend(self.collapsed)  # it may have been moved out of one
+                continue
+            index = self.entry_index(entry)
+            if kind == Mutation.reordered and entry.depth > 0:
+                # The previous parent is the last entry before it at a lower depth
+                parent_index = index - 1
+                while linear_copy[parent_index].depth >= entry.depth:
+                    parent_index -= 1
+                parents.append(linear_copy[parent_index].weak_reference())
+            end = self.subtree_end(entry)
+            for cut_entry in linear_copy[index:end]:
+                cut_entry.index = -1
+                cut_entries.append(cut_entry)
+            del linear_copy[index:end]
+            self.splices.append((index, index - end))
+            start = min(start, index)
+
+        for kind, node in mutations:
+            if kind == Mutation.removed or self.linearized_entry(node) is not None:
+                continue  # removed, or spliced in with its parent node
+            parents.append(node.parent)
+            index = self.insertion_index(node)
+            if index is None:
+                continue
+            parent_entry = self.linearized_entry(node.parent)
+            depth = 0 if parent_entry is None else parent_entry.depth + 1
+            inserted = []
+            self.traverse_nodes((node,), inserted, self.entries, [], depth)
+            linear_copy[index:index] = inserted
+            self.splices.append((index, len(inserted)))
+            for entry in inserted:
+                entry.index += index
+                entry.shifts = len(self.splices)
+            start = min(start, index)
+
+        for parent in parents:
+            entry = self.linearized_entry(parent)
+            if entry is not None:
+                self.update_expanded(entry, parent)
+        self.renumber_entries(start)
+        for entry in cut_entries:
+            if entry.index == -1 and self.entries.get(entry.node_id) is entry:
+                del self.entries[entry.node_id]
+        self.entries_moved(start, old_length)
+
+    def entry_index(self, entry) -> int:
+        """The index of the entry in the linear copy (or -1), correcting its index
+        by the splices made since it was numbered, until they are renumbered."""
+        index = entry.index
+        if index != -1:
+            for splice_index, change in self.splices[entry.shifts:]:
+                if index >= splice_index:
+                    index += change
+        return index
+
+    def linearized_entry(self, node):
+        """The entry of the node, if it is in the linear copy, otherwise None."""
+        entry = self.entries.get(id(node))
+        if entry is not None and entry.weak_reference() is node:
+            index = self.entry_index(entry)
+            if 0 <= index < len(self.linear_copy) and self.linear_copy[index] is entry:
+                return entry
+        return None
+
+    def subtree_end(self, entry) -> int:
+        """The index after the entries of the child nodes of the entry."""
+        linear_copy, depth = self.linear_copy, entry.depth
+        end = self.entry_index(entry) + 1
+        while end < len(linear_copy) and linear_copy[end].depth > depth:
+            end += 1
+        return end
+
+    def insertion_index(self, node):
+        """The index to insert the entry of the node at, after the entries
+        of its previous sibling nodes, or None if it is not shown in the tree."""
+        parent = node.parent
+        if parent is self.tree:
+            index = 0
+        else:
+            parent_entry = self.linearized_entry(parent)
+            if parent_entry is None:
+                return None
+            self.update_expanded(parent_entry, parent)
+            if not parent_entry.expanded:
+                return None
+            index = self.entry_index(parent_entry) + 1
+        position = self.sibling_position(node)
+        if position is None:  # removed
+            return None
+        siblings = parent.nodes
+        for i in range(position - 1, -1, -1):
+            sibling_entry = self.linearized_entry(siblings[i])
+            if sibling_entry is not None:
+                return self.subtree_end(sibling_entry)
+        return index
+
+    def sibling_position(self, node):
+        """The index of the node in the node list of its parent, as recorded in
+        its mutation if still correct, or None if it is not in the list."""
+        siblings = node.parent.nodes
+        position = self.mutations.positions.get(id(node)) if self.mutations is not None else None
+        if position is not None and position < len(siblings) and siblings[position] is node:
+            return position
+        try:
+            return siblings.index(node)
+        except ValueError:
+            return None
+
+    def renumber_entries(self, start_index):
+        """Sets the index of each entry from the start index onwards, after
+        the splices from there on, which are then cleared."""
+        linear_copy = self.linear_copy
+        for index in range(start_index, len(linear_copy)):
+            entry = linear_copy[index]
+            entry.index = index
+            entry.shifts = 0
+        self.splices.clear()
+
+    def update_expanded(self, entry, node):
+        """Redraws the entry if its node gained its first child node or lost its last."""
+        expanded = None if not node.nodes else node not in self.collapsed
+        if expanded != entry.expanded:
+            entry.expanded = expanded
+            self.entry_redraw(entry)
+            self.entry_changed(entry)
+
+    def entries_moved(self, start_index, old_length):
+        """Draws the tiles in view from the start index again, after entries
+        were inserted or removed there (when the linear copy had old_length)."""
+        view_stop = self.forward_to_index(self.transform.height) + 1
+        if start_index >= view_stop:
+            return
+        indexes = self.indexes_in_view()
+        if start_index < indexes.start or len(self.linear_copy) < min(old_length, view_stop):
+            self.dirty = 1  # every tile in view moved, or rows were emptied
+        else:
+            for index in range(start_index, indexes.stop):
+                self.redraw_tile(index)
+
+    def node_changed(self, node):
+        """Redraws the entry of the node if it is enabled or shown."""
+        entry = self.entries.get(id(node))
+        if entry is None or entry.weak_reference() is not node:
+            return
+        node_visible = getattr(node, 'visible', -1)
+        node_enabled = getattr(node, 'enabled', -1)
+        if node_enabled != entry.reference_enabled or node_visible != entry.reference_visible:
+            entry.reference_enabled = node_enabled
+            entry.reference_visible = node_visible
+            self.entry_redraw(entry)
+            self.entry_changed(entry)
+
+    def traverse_nodes(self, nodes, linear_copy, entries, changed_indexes, depth=0):
+        """Perform a pre-order traversal of the nodes and their child nodes,
+        appending the entry of each node to the linear copy and to the entries
+        by id(node). Entries whose node is enabled, shown, moved, collapsed or
+        expanded are redrawn. The child nodes of collapsed nodes are not traversed."""
+        previous_entries = self.entries
+        collapsed = self.collapsed
+        for node in nodes:
+            expanded = None if not node.nodes else node not in collapsed
+            entry = previous_entries.get(id(node))
+            if entry is None or entry.weak_reference() is not node:
+                entry = self.new_entry(node, depth, expanded)
+            else:
+                node_visible = getattr(node, 'visible', -1)
+                node_enabled = getattr(node, 'enabled', -1)
+                # Ensure that the properties of the entry still match
+                if (node_enabled != entry.reference_enabled or node_visible != entry.reference_visible
+                        or depth != entry.depth or expanded != entry.expanded):
+                    entry.reference_enabled = node_enabled
+                    entry.reference_visible = node_visible
+                    entry.depth = depth
+                    entry.expanded = expanded
+                    self.entry_redraw(entry)
+                    changed_indexes.append(len(linear_copy))
+            entry.index = len(linear_copy)
+            entry.shifts = 0
+            entries[id(node)] = entry
+            linear_copy.append(entry)
+            if expanded:
+                self.traverse_nodes(node.nodes, linear_copy, entries, changed_indexes, depth + 1)
+
+    def toggle_collapsed(self, entry):
+        """Collapses the node of the entry, hiding its child nodes, or expands it."""
+        node = entry.weak_reference()
+        if entry.expanded:
+            self.collapsed.add(node)
+        elif entry.expanded is not None:
+            self.collapsed.discard(node)
+        self.update_linear_copy()
 
     def entry_redraw(self, entry):
+        if entry.image is None:  # drawn when it is next in view
+            return
         background_name = 'background'
         if entry == self.selected_entry:
             background_name = 'background_selected'
@@ -133,7 +382,13 @@ class TreeTabGrid(interface.UniformListLayout):
             name_color = interface.brighten_color(self.style.get('color'), -18)
         else:
             name_color = string_color(node_name)
-        text.draw(entry.image, node_name, (entry.depth * 8 + 32, 2), color=name_color)
+        name_rect = text.draw(entry.image, node_name, (entry.depth * 8 + 32, 2), color=name_color)
+        if entry.expanded is not None:
+            marker_rect = text.draw(entry.image, '[-]' if entry.expanded else '[+]', (name_rect.right + 4, 2),
+                                    color=interface.brighten_color(self.style.get('color'), -18))
+            entry.marker_range = marker_rect.left, marker_rect.right
+        else:
+            entry.marker_range = None
         if not entry.weak_reference() in node_to_template:
             if entry == self.selected_entry or entry == self.hovered_entry:
                 text.draw(entry.image, 'generated +', (self.transform.width - self.g_text_offset - 15, 2),
@@ -141,14 +396,19 @@ class TreeTabGrid(interface.UniformListLayout):
             else:
                 text.draw(entry.image, '+', (self.transform.width - 15, 2),
                           interface.brighten_color(self.style.get('color'), -18), static=True)
-        self.dirty = 1
+
+    def entry_changed(self, entry):
+        """Draws the tile of the entry again, if it is in the linear copy."""
+        index = self.entry_index(entry)
+        if 0 <= index < len(self.linear_copy) and self.linear_copy[index] is entry:
+            self.redraw_tile(index)
 
     def on_resize(self):
         super().on_resize()
-        for tile in self.tiles:
-            if hasattr(tile, 'image'):
-                tile.image = pygame.Surface(self.forward_to_rect(0).size)
-                self.entry_redraw(tile)
+        self.surface_pool.clear()
+        for entry in self.drawn_entries:
+            entry.image = pygame.Surface(self.forward_to_rect(0).size)
+            self.entry_redraw(entry)
         if self.nodes:
             self.nodes[0].scroll_by(0)  # reposition and resize the scrollbar
 
@@ -157,7 +417,11 @@ class TreeTabGrid(interface.UniformListLayout):
             index = self.position_to_index((event.pos[0] - self.rect.x,
                                             event.pos[1] - self.rect.y))
             if 0 <= index < len(self.tiles):
-                if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+                entry = self.tiles[index]
+                if (event.type == pygame.MOUSEBUTTONDOWN and event.button == 1
+                        and self.collapse_hit_test(entry, event.pos[0] - self.rect.x)):
+                    self.toggle_collapsed(entry)  # clicked the icon or marker
+                elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
                     self.replace_entry(self.tiles[index], 'selected_entry')
                     self.parent.parent.set_selected_node(self.selected_entry.weak_reference())
                 elif event.type == pygame.MOUSEMOTION:
@@ -165,6 +429,16 @@ class TreeTabGrid(interface.UniformListLayout):
         elif event.type == pygame.MOUSEMOTION:
             self.replace_entry(None, 'hovered_entry')
 
+    @staticmethod
+    def collapse_hit_test(entry, x) -> bool:
+        """Whether the x position in the entry is on its icon or its [+]/[-]
+        marker, if its node has child nodes."""
+        if entry.expanded is None:
+            return False
+        if x < entry.depth * 8 + 12:
+            return True
+        return entry.marker_range is not None and entry.marker_range[0] <= x < entry.marker_range[1]
+
     def replace_entry(self, new_entry, attribute_name):
         previous_entry = getattr(self, attribute_name, None)
         if new_entry is previous_entry:  # skip if the entry does not change
@@ -172,14 +446,18 @@ class TreeTabGrid(interface.UniformListLayout):
         setattr(self, attribute_name, new_entry)  # reassign entry (read by entry_redraw)
         if previous_entry is not None:
             self.entry_redraw(previous_entry)  # previous entry un-highlighted
+            self.entry_changed(previous_entry)
         if new_entry is not None:
             self.entry_redraw(new_entry)  # newly stored entry is highlighted
+            self.entry_changed(new_entry)
         return new_entry
 
     def set_tree(self, tree):
+        self.subscribe(tree)
         self.tree = tree
+        self.entries = {}
         self.linear_copy.clear()
-        self.get_linear_copy(self.tree)
+        self.update_linear_copy()
         self.dirty = 1
 
 class TreeTab(SpriteNode):